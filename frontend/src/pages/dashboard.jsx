@@ -88,6 +88,19 @@ const Dashboard = () => {
     fetchInitialData();
   }, [navigate]);
 
+  // Consulta o status de um job de análise até ele ser concluído ou falhar
+  const waitForJob = async (jobId, token) => {
+    while (true) {
+      const response = await axios.get(`/api/jobs/${jobId}`, {
+        headers: { 'x-access-token': token }
+      });
+      if (['completed', 'failed'].includes(response.data.status)) {
+        return response.data;
+      }
+      await new Promise(resolve => setTimeout(resolve, 3000));
+    }
+  };
+
   // Função para análise completa
   const handleFullAnalysis = async () => {
     if (analysisCount >= 5) {
@@ -100,11 +113,17 @@ const Dashboard = () => {
       const token = localStorage.getItem('token');
       const channel = localStorage.getItem('youtube_channel');
       
-      await axios.post('/api/analyze-channel-complete', 
+      const jobResponse = await axios.post('/api/analyze-channel-complete', 
         { channel_name: channel },
         { headers: { 'x-access-token': token } }
       );
       
+      // A análise roda em segundo plano: acompanhar o job até terminar
+      const job = await waitForJob(jobResponse.data.job_id, token);
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Analysis failed');
+      }
+      
       // Atualizar contagem e data
       const userResponse = await axios.get('/api/user', {
         headers: { 'x-access-token': token }
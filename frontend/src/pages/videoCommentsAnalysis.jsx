@@ -9,6 +9,8 @@ const VideoComments = () => {
   const [totalPages, setTotalPages] = useState(1);
   const [selectedVideo, setSelectedVideo] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [totalComments, setTotalComments] = useState(0);
   const [loading, setLoading] = useState({
     videos: false,
     comments: false
@@ -49,7 +51,8 @@ const VideoComments = () => {
     }
   };
 
-  const fetchComments = async (videoId) => {
+  // Sem cursor carrega a primeira página; com cursor acrescenta a próxima página à lista
+  const fetchComments = async (videoId, cursor = null) => {
     if (!videoId) return;
     
     setLoading(prev => ({ ...prev, comments: true }));
@@ -62,15 +65,21 @@ const VideoComments = () => {
           headers: { 
             'x-access-token': token,
             'Content-Type': 'application/json'
-          }
+          },
+          params: cursor ? { cursor } : {}
         }
       );
       
       if (response.data.success && response.data.comments) {
-        setComments(response.data.comments);
+        setComments(prev => cursor ? [...prev, ...response.data.comments] : response.data.comments);
+        setCommentsCursor(response.data.pagination?.next_cursor || null);
+        if (!cursor) {
+          setTotalComments(response.data.pagination?.total ?? response.data.comments.length);
+        }
       } else {
         setError(response.data.message || 'Nenhum comentário encontrado');
         setComments([]);
+        setCommentsCursor(null);
       }
     } catch (err) {
       if (err.response?.status === 401) {
@@ -81,6 +90,7 @@ const VideoComments = () => {
         setError(err.response?.data?.message || 'Erro ao carregar comentarios');
       }
       setComments([]);
+      setCommentsCursor(null);
     } finally {
       setLoading(prev => ({ ...prev, comments: false }));
     }
@@ -170,12 +180,12 @@ const VideoComments = () => {
           <>
             <h2>{selectedVideo.title}</h2>
             
-            {loading.comments ? (
+            {loading.comments && comments.length === 0 ? (
               <div className={style.loading}>Carregando comentários...</div>
             ) : (
               <div className={style.commentsContainer}>
                 <div className={style.commentsHeader}>
-                  <h3>Comentários ({comments.length})</h3>
+                  <h3>Comentários ({totalComments})</h3>
                   <div className={style.commentControls}>
                     <button 
                       onClick={() => fetchComments(selectedVideo.video_id)}
@@ -187,6 +197,7 @@ const VideoComments = () => {
                 </div>
                 
                 {comments.length > 0 ? (
+                  <>
                   <ul className={style.commentsList}>
                     {comments.map((comment) => (
                       <li key={comment.id} className={style.comment}>
@@ -216,6 +227,17 @@ const VideoComments = () => {
                       </li>
                     ))}
                   </ul>
+                  {commentsCursor && (
+                    <div className={style.pagination}>
+                      <button
+                        onClick={() => fetchComments(selectedVideo.video_id, commentsCursor)}
+                        disabled={loading.comments}
+                      >
+                        {loading.comments ? 'CARREGANDO...' : 'CARREGAR MAIS'}
+                      </button>
+                    </div>
+                  )}
+                  </>
                 ) : (
                   <div className={style.noComments}>
                     Nenhum comentário encontrado para este vídeo.
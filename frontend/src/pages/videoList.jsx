@@ -6,6 +6,8 @@ const VideoList = ({ onVideoSelect, analysisTimestamp }) => {
   const [videos, setVideos] = useState([]);
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  // cursors[i] é o cursor da página i + 1 (a primeira página não tem cursor)
+  const [cursors, setCursors] = useState([null]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [selectedVideoId, setSelectedVideoId] = useState(null);
@@ -16,11 +18,19 @@ const VideoList = ({ onVideoSelect, analysisTimestamp }) => {
       const token = localStorage.getItem('token');
       const response = await axios.get('/api/videos', {
         headers: { 'x-access-token': token },
-        params: { page: currentPage, per_page: 5 }
+        params: { per_page: 5, ...(cursors[currentPage - 1] ? { cursor: cursors[currentPage - 1] } : {}) }
       });
       
       setVideos(response.data.videos);
       setTotalPages(response.data.pagination.pages);
+      const nextCursor = response.data.pagination.next_cursor;
+      if (nextCursor) {
+        setCursors(prev => {
+          const updated = prev.slice(0, currentPage);
+          updated[currentPage] = nextCursor;
+          return updated;
+        });
+      }
       
       // Mantém o vídeo selecionado se ainda estiver na página atual
       if (!response.data.videos.some(v => v.video_id === selectedVideoId)) {
@@ -105,7 +115,7 @@ const VideoList = ({ onVideoSelect, analysisTimestamp }) => {
               <span>Página {currentPage} de {totalPages}</span>
               <button
                 onClick={() => setCurrentPage(prev => Math.min(prev + 1, totalPages))}
-                disabled={currentPage === totalPages || loading}
+                disabled={currentPage === totalPages || !cursors[currentPage] || loading}
               >
                 Próxima
               </button>
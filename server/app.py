@@ -4,25 +4,42 @@ import re
 import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, has_app_context, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 import jwt
-from functools import wraps
+from functools import wraps, partial
+from contextlib import contextmanager
 import googleapiclient.discovery
+import httplib2
+from googleapiclient import discovery_cache
 from googleapiclient.errors import HttpError
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 from io import BytesIO
 import base64
+import csv
+import io
+import json
+import tempfile
 import time
+import hashlib
+import unicodedata
+from collections import OrderedDict, deque
+import threading
+import queue
+import asyncio
+import itertools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from sqlalchemy import func, exc, or_, and_
-from urllib.parse import unquote
+from sqlalchemy import func, exc, or_, and_, insert, literal, inspect, text, select
+from urllib.parse import quote, unquote
 import matplotlib
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment
@@ -30,8 +47,22 @@ from openpyxl.utils import get_column_letter
 from io import BytesIO
 from flask import send_file
 
+# Exportação em Parquet é opcional (pip install pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Motor de busca assíncrono é opcional (pip install httpx)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 matplotlib.use('Agg')
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 # Carrega as variaveis de ambiente
 load_dotenv()
@@ -66,7 +97,7 @@ def handle_options():
 # Configuração DataBase do Banco
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:3306/{os.getenv('DB_NAME')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:3306/{os.getenv('DB_NAME')}"
 
 
 db = SQLAlchemy(app)
@@ -83,6 +114,9 @@ class User(db.Model):
     token_expiration = db.Column(db.DateTime)
     last_analysis = db.Column(db.DateTime)
     analysis_count = db.Column(db.Integer, default=0)
+    __table_args__ = (
+        db.Index('idx_email_lower', func.lower(email), unique=True),
+    )
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -100,10 +134,17 @@ class Analysis(db.Model):
     positive_comments = db.Column(db.Integer)
     neutral_comments = db.Column(db.Integer)
     negative_comments = db.Column(db.Integer)
-    sentiment_pie_chart = db.Column(db.Text)
-    sentiment_bar_chart = db.Column(db.Text)
-    engagement_chart = db.Column(db.Text)
+    # Gráficos em base64 das análises antigas; só são carregados se acessados
+    sentiment_pie_chart = db.deferred(db.Column(db.Text))
+    sentiment_bar_chart = db.deferred(db.Column(db.Text))
+    engagement_chart = db.deferred(db.Column(db.Text))
+    # running enquanto o job grava os comentários; só análises completed aparecem nas rotas
+    status = db.Column(db.String(20), nullable=False, default='completed', server_default='completed')
     user = db.relationship('User', backref='analyses')
+    __table_args__ = (
+        db.Index('ix_analysis_user_status_date', 'user_id', 'status', 'analysis_date'),
+        db.Index('ix_analysis_user_channel_date', 'user_id', 'channel_id', 'analysis_date'),
+    )
 
 class VideoAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -115,17 +156,44 @@ class VideoAnalysis(db.Model):
     comments = db.Column(db.Integer)
     published_at = db.Column(db.DateTime)
     analysis = db.relationship('Analysis', backref='videos')
+    __table_args__ = (
+        db.Index('ix_video_analysis_analysis_published', 'analysis_id', 'published_at'),
+        db.Index('ix_video_analysis_video_id', 'video_id'),
+    )
+
+# Liga cada análise aos comentários que ela contém (um comentário pode estar em várias análises)
+analysis_comments = db.Table(
+    'analysis_comments',
+    db.Column('analysis_id', db.Integer, db.ForeignKey('analysis.id'), primary_key=True),
+    db.Column('comment_id', db.Integer, db.ForeignKey('comment_analysis.id'), primary_key=True),
+    db.Index('ix_analysis_comments_comment_id', 'comment_id')
+)
 
 class CommentAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    # Análise que gravou o comentário pela primeira vez
     analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'), nullable=False)
+    youtube_comment_id = db.Column(db.String(100), unique=True)
     video_id = db.Column(db.String(100))
     author = db.Column(db.String(100))
     text = db.Column(db.Text)
     likes = db.Column(db.Integer)
     sentiment = db.Column(db.String(20))
     published_at = db.Column(db.DateTime)
-    analysis = db.relationship('Analysis', backref='comments')
+    analysis = db.relationship('Analysis')
+    analyses = db.relationship('Analysis', secondary=analysis_comments, backref='comments')
+    __table_args__ = (
+        db.Index('ix_comment_analysis_analysis_video_published', 'analysis_id', 'video_id', 'published_at'),
+        db.Index('ix_comment_analysis_video_published', 'video_id', 'published_at'),
+    )
+
+# Comentário mais novo já visto em cada vídeo, por usuário: a próxima busca para nele
+class CommentHighWaterMark(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    video_id = db.Column(db.String(100), primary_key=True)
+    comment_id = db.Column(db.String(100), nullable=False)
+    published_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class VideoCache(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -135,6 +203,231 @@ class VideoCache(db.Model):
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     analysis_data = db.Column(db.JSON) 
     user = db.relationship('User', backref='video_cache')
+    __table_args__ = (
+        db.Index('ix_video_cache_user_channel_video', 'user_id', 'channel_id', 'video_id'),
+    )
+
+# Canais acompanhados pelo usuário; o channel_id resolvido evita repetir o search.list (100 unidades)
+class TrackedChannel(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    channel_id = db.Column(db.String(100), nullable=False)
+    channel_name = db.Column(db.String(100), nullable=False)
+    title = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_analyzed_at = db.Column(db.DateTime)
+    # videoCount do canal na última análise e última verificação do agendador
+    video_count = db.Column(db.Integer)
+    last_checked_at = db.Column(db.DateTime)
+    user = db.relationship('User', backref='tracked_channels')
+    __table_args__ = (
+        db.Index('ix_tracked_channel_user_channel', 'user_id', 'channel_id', unique=True),
+    )
+
+# Vários canais enviados numa única requisição; cada canal vira um AnalysisJob
+class AnalysisBatch(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    mode = db.Column(db.String(20), nullable=False, default='incremental')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    jobs = db.relationship('AnalysisJob', backref='batch', order_by='AnalysisJob.id')
+    __table_args__ = (
+        db.Index('ix_analysis_batch_user_created', 'user_id', 'created_at'),
+    )
+
+class AnalysisJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    batch_id = db.Column(db.Integer, db.ForeignKey('analysis_batch.id'))
+    channel_name = db.Column(db.String(100), nullable=False)
+    # incremental: só vídeos novos; refresh: também atualiza as estatísticas dos vídeos conhecidos
+    mode = db.Column(db.String(20), nullable=False, default='incremental', server_default='incremental')
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    phase = db.Column(db.String(50), nullable=False, default='queued')
+    videos_fetched = db.Column(db.Integer, default=0)
+    comments_fetched = db.Column(db.Integer, default=0)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'))
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    user = db.relationship('User', backref='analysis_jobs')
+    __table_args__ = (
+        db.Index('ix_analysis_job_status_created', 'status', 'created_at'),
+        db.Index('ix_analysis_job_batch', 'batch_id'),
+    )
+
+# Totais de cada análise concluída, gravados uma vez na ingestão
+class AnalysisRollup(db.Model):
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    channel_id = db.Column(db.String(100), nullable=False)
+    analysis_date = db.Column(db.DateTime, nullable=False)
+    subscriber_count = db.Column(db.Integer, default=0)
+    video_count = db.Column(db.Integer, default=0)
+    total_views = db.Column(db.BigInteger, default=0)
+    total_likes = db.Column(db.BigInteger, default=0)
+    total_comments = db.Column(db.Integer, default=0)
+    positive_comments = db.Column(db.Integer, default=0)
+    neutral_comments = db.Column(db.Integer, default=0)
+    negative_comments = db.Column(db.Integer, default=0)
+    __table_args__ = (
+        db.Index('ix_analysis_rollup_user_date', 'user_id', 'analysis_date'),
+        db.Index('ix_analysis_rollup_user_channel_date', 'user_id', 'channel_id', 'analysis_date'),
+    )
+
+# Situação do canal ao fim de cada dia (última análise do dia)
+class ChannelDailyRollup(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    channel_id = db.Column(db.String(100), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    analysis_count = db.Column(db.Integer, default=0)
+    subscriber_count = db.Column(db.Integer, default=0)
+    video_count = db.Column(db.Integer, default=0)
+    total_views = db.Column(db.BigInteger, default=0)
+    total_likes = db.Column(db.BigInteger, default=0)
+    total_comments = db.Column(db.Integer, default=0)
+    positive_comments = db.Column(db.Integer, default=0)
+    neutral_comments = db.Column(db.Integer, default=0)
+    negative_comments = db.Column(db.Integer, default=0)
+
+class SentimentCacheEntry(db.Model):
+    text_hash = db.Column(db.String(40), primary_key=True)
+    sentiment = db.Column(db.String(20), nullable=False)
+    compound = db.Column(db.Float, nullable=False)
+
+# Métricas no formato de exposição de texto do Prometheus (servidas em /metrics)
+METRICS = {
+    'youtube_api_calls_total': ('counter', 'Chamadas à YouTube Data API por endpoint e chave'),
+    'youtube_api_errors_total': ('counter', 'Erros da YouTube Data API por endpoint e motivo'),
+    'youtube_quota_units_total': ('counter', 'Unidades de quota gastas por endpoint e chave'),
+    'youtube_api_call_seconds': ('summary', 'Duração das chamadas à YouTube Data API'),
+    'youtube_quota_remaining': ('gauge', 'Unidades de quota restantes no dia por chave'),
+    'analysis_stage_seconds': ('summary', 'Tempo gasto em cada etapa das análises'),
+    'analysis_comments_processed_total': ('counter', 'Comentários buscados e analisados pelas análises'),
+    'analysis_jobs_total': ('counter', 'Jobs de análise finalizados por status'),
+    'analysis_job_seconds': ('summary', 'Duração dos jobs de análise por modo'),
+    'channel_refresh_checks_total': ('counter', 'Canais acompanhados verificados pelo agendador por resultado'),
+    'channel_refresh_seconds': ('summary', 'Duração das rodadas de verificação do agendador'),
+    'cache_hits_total': ('counter', 'Acertos por cache'),
+    'cache_misses_total': ('counter', 'Faltas por cache'),
+    'cache_hit_ratio': ('gauge', 'Fração de acertos por cache'),
+    'cache_entries': ('gauge', 'Entradas em memória por cache'),
+}
+
+def format_metric_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class MetricsRegistry:
+    """Contadores e somatórios de tempo do processo; valores de outros componentes são lidos na coleta"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._summaries = {}
+        self._collectors = []
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            total = self._summaries.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def collector(self, f):
+        """Registra uma função que gera (nome, labels, valor) no momento da coleta"""
+        self._collectors.append(f)
+        return f
+
+    def render(self, hidden_labels=()):
+        """Texto de exposição; as séries com labels em hidden_labels são somadas sem eles"""
+        series = {}
+        
+        def add(name, suffix, labels, value):
+            labels = tuple(label for label in labels if label[0] not in hidden_labels)
+            values = series.setdefault(name, {})
+            values[(suffix, labels)] = values.get((suffix, labels), 0) + value
+            
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                add(name, '', labels, value)
+            for (name, labels), (total, count) in self._summaries.items():
+                add(name, '_sum', labels, total)
+                add(name, '_count', labels, count)
+        for collect in self._collectors:
+            for name, labels, value in collect():
+                add(name, '', tuple(sorted(labels.items())), value)
+        
+        lines = []
+        for name in sorted(series):
+            kind, description = METRICS[name]
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (suffix, labels), value in sorted(series[name].items()):
+                lines.append(f'{name}{suffix}{format_metric_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+class StageTimings:
+    """Tempo por etapa de uma análise (channel_lookup, video_enumeration, comment_paging, ...).
+
+    Etapas executadas em paralelo somam o tempo de cada thread; rate_limit_wait já está
+    contido nas etapas que chamam a API.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._stages = {}
+        self.api_calls = {}
+        self.quota_units = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds, count=1):
+        with self._lock:
+            total = self._stages.setdefault(name, [0.0, 0])
+            total[0] += seconds
+            total[1] += count
+        metrics.observe('analysis_stage_seconds', seconds, stage=name)
+
+    def record_api_call(self, endpoint, units):
+        with self._lock:
+            self.api_calls[endpoint] = self.api_calls.get(endpoint, 0) + 1
+            self.quota_units += units
+
+    def breakdown(self, comments=0):
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            return {
+                'total_seconds': round(elapsed, 3),
+                'stages': {
+                    name: {'seconds': round(seconds, 3), 'count': count}
+                    for name, (seconds, count) in self._stages.items()
+                },
+                'api_calls': dict(self.api_calls),
+                'quota_units': self.quota_units,
+                'comments_per_second': round(comments / elapsed, 1) if elapsed else 0.0
+            }
 
 # YouTube API Configuração
 API_SERVICE_NAME = "youtube"
@@ -144,52 +437,808 @@ DEVELOPER_KEYS = [
     os.getenv('YOUTUBE_API_KEY_2'),
     os.getenv('YOUTUBE_API_KEY_3')
 ]
-current_key_index = 0
 
-class YouTubeAnalyzer:
-    def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
-    
-    def get_youtube_service(self):
-        global current_key_index
-        key = DEVELOPER_KEYS[current_key_index]
-        current_key_index = (current_key_index + 1) % len(DEVELOPER_KEYS)
-        logging.info(f"Using API key: {key[:5]}...{key[-5:]}")
-        return googleapiclient.discovery.build(
-            API_SERVICE_NAME, 
-            API_VERSION, 
-            developerKey=key,
-            cache_discovery=False
+# Custo (unidades de quota) de cada método da YouTube Data API
+QUOTA_COSTS = {
+    'search.list': 100,
+    'channels.list': 1,
+    'videos.list': 1,
+    'commentThreads.list': 1,
+    'playlistItems.list': 1
+}
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))
+
+# A quota diária do YouTube é zerada à meia-noite no horário do Pacífico
+try:
+    QUOTA_RESET_TZ = ZoneInfo('America/Los_Angeles')
+except ZoneInfoNotFoundError:
+    QUOTA_RESET_TZ = timezone(timedelta(hours=-8))
+
+class QuotaExhaustedError(Exception):
+    pass
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+def youtube_discovery_document():
+    """Documento de discovery da API já decodificado, carregado uma única vez por processo"""
+    global _discovery_document
+    with _discovery_lock:
+        if _discovery_document is None:
+            document = discovery_cache.get_static_doc(API_SERVICE_NAME, API_VERSION)
+            _discovery_document = json.loads(document) if document else False
+        return _discovery_document
+
+def build_youtube_service(key):
+    document = youtube_discovery_document()
+    if document:
+        return googleapiclient.discovery.build_from_document(document, developerKey=key)
+    return googleapiclient.discovery.build(
+        API_SERVICE_NAME, 
+        API_VERSION, 
+        developerKey=key,
+        cache_discovery=False
+    )
+
+def is_quota_error(error):
+    return isinstance(error, HttpError) and (
+        'quotaExceeded' in str(error) or 'dailyLimitExceeded' in str(error)
+    )
+
+class APIKeyPool:
+    """Distribui as chamadas entre as chaves da API controlando a quota gasta por chave"""
+
+    def __init__(self, keys, daily_quota=YOUTUBE_DAILY_QUOTA, service_factory=build_youtube_service):
+        self.keys = [key for key in keys if key]
+        self.daily_quota = daily_quota
+        self.service_factory = service_factory
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._services = {key: [] for key in self.keys}
+        self._reset(self._quota_day())
+
+    def _quota_day(self):
+        return datetime.now(QUOTA_RESET_TZ).date()
+
+    def _reset(self, day):
+        self._day = day
+        self._used = {key: 0 for key in self.keys}
+        self._calls = {key: {} for key in self.keys}
+        self._exhausted = set()
+
+    def _check_reset(self):
+        day = self._quota_day()
+        if day != self._day:
+            self._reset(day)
+
+    def acquire(self, endpoint):
+        """Escolhe uma chave com quota disponível e já desconta o custo da chamada"""
+        cost = QUOTA_COSTS.get(endpoint, 1)
+        with self._lock:
+            self._check_reset()
+            for offset in range(len(self.keys)):
+                index = (self._next_index + offset) % len(self.keys)
+                key = self.keys[index]
+                if key in self._exhausted or self._used[key] + cost > self.daily_quota:
+                    continue
+                self._next_index = (index + 1) % len(self.keys)
+                self._used[key] += cost
+                self._calls[key][endpoint] = self._calls[key].get(endpoint, 0) + 1
+                return key
+        raise QuotaExhaustedError(f"No API key has quota left for {endpoint}")
+
+    def mark_exhausted(self, key):
+        with self._lock:
+            self._exhausted.add(key)
+        logging.warning(f"API key {self.mask(key)} exhausted until the next quota reset")
+
+    @contextmanager
+    def service(self, key):
+        """Reaproveita os clientes já construídos para a chave (um por thread em uso)"""
+        with self._lock:
+            free = self._services[key]
+            youtube = free.pop() if free else None
+        if youtube is None:
+            logging.info(f"Building YouTube client for API key: {self.mask(key)}")
+            youtube = self.service_factory(key)
+        try:
+            yield youtube
+        finally:
+            with self._lock:
+                self._services[key].append(youtube)
+
+    def warm(self, clients_per_key=1):
+        """Constrói antecipadamente os clientes de cada chave (cada um mantém sua conexão HTTP aberta)"""
+        for key in self.keys:
+            with self._lock:
+                missing = clients_per_key - len(self._services[key])
+            built = [self.service_factory(key) for _ in range(max(0, missing))]
+            with self._lock:
+                self._services[key].extend(built)
+
+    @staticmethod
+    def mask(key):
+        """Só para os logs do servidor"""
+        return f"{key[:5]}...{key[-5:]}"
+
+    def label(self, key):
+        """Identificação pública da chave (posição no pool), sem nenhum caractere dela"""
+        return f"key-{self.keys.index(key) + 1}"
+
+    def stats(self):
+        with self._lock:
+            self._check_reset()
+            next_reset = datetime.combine(self._day + timedelta(days=1), datetime.min.time(), QUOTA_RESET_TZ)
+            keys = [{
+                'key': self.label(key),
+                'used': self._used[key],
+                'remaining': 0 if key in self._exhausted else max(0, self.daily_quota - self._used[key]),
+                'exhausted': key in self._exhausted,
+                'calls': dict(self._calls[key])
+            } for key in self.keys]
+        return {
+            'daily_quota': self.daily_quota,
+            'remaining': sum(k['remaining'] for k in keys),
+            'resets_at': next_reset.isoformat(),
+            'keys': keys
+        }
+
+youtube_key_pool = APIKeyPool(DEVELOPER_KEYS)
+
+# Ritmo das requisições à API do YouTube
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv('YOUTUBE_REQUESTS_PER_SECOND', 5))
+YOUTUBE_REQUEST_BURST = int(os.getenv('YOUTUBE_REQUEST_BURST', 10))
+COMMENT_FETCH_WORKERS = int(os.getenv('COMMENT_FETCH_WORKERS', 4))
+
+class TokenBucket:
+    """Rate limiter token bucket compartilhado entre threads (e com o motor assíncrono)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens):
+        """Consome os tokens se houver; senão retorna quanto tempo esperar"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        while wait := self._take(tokens):
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        while wait := self._take(tokens):
+            await asyncio.sleep(wait)
+
+youtube_rate_limiter = TokenBucket(YOUTUBE_REQUESTS_PER_SECOND, YOUTUBE_REQUEST_BURST)
+
+# Motor de busca: 'threads' (googleapiclient, uma thread por vídeo) ou 'async' (httpx + asyncio)
+YOUTUBE_FETCH_ENGINE = os.getenv('YOUTUBE_FETCH_ENGINE', 'threads')
+YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3'
+ASYNC_FETCH_CONCURRENCY = int(os.getenv('ASYNC_FETCH_CONCURRENCY', 200))
+ASYNC_FETCH_TIMEOUT = float(os.getenv('ASYNC_FETCH_TIMEOUT', 30))
+
+if YOUTUBE_FETCH_ENGINE == 'async' and httpx is None:
+    logging.warning("YOUTUBE_FETCH_ENGINE=async requires httpx (pip install httpx); falling back to threads")
+
+class AsyncFetchEngine:
+    """Event loop numa thread de fundo com um único cliente HTTP keep-alive para a Data API.
+
+    Qualquer thread submete corrotinas com run()/submit(); todas as requisições do processo
+    dividem o pool de conexões e o limite de requisições em andamento.
+    """
+
+    def __init__(self, concurrency=ASYNC_FETCH_CONCURRENCY, transport=None):
+        self.concurrency = concurrency
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+        self._slots = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='youtube-async', daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    async def _open(self):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=YOUTUBE_API_URL,
+            limits=limits,
+            timeout=ASYNC_FETCH_TIMEOUT,
+            transport=self.transport
+        )
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    def submit(self, coro):
+        """Agenda a corrotina no loop; retorna um concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro):
+        return self.submit(coro).result()
+
+    async def get(self, resource, params, key):
+        query = {name: value for name, value in params.items() if value is not None}
+        async with self._slots:
+            response = await self._client.get(f'/{resource}', params={**query, 'key': key})
+        if response.status_code >= 400:
+            # Mesmo erro do googleapiclient: is_quota_error e "commentsDisabled" continuam valendo
+            raise HttpError(
+                httplib2.Response({'status': response.status_code}),
+                response.content,
+                uri=str(response.url.copy_with(query=None))
+            )
+        return response.json()
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+youtube_async_engine = AsyncFetchEngine()
+
+# Páginas de comentários aguardando análise, por thread de busca
+COMMENT_QUEUE_PAGES_PER_WORKER = int(os.getenv('COMMENT_QUEUE_PAGES_PER_WORKER', 4))
+
+# Análise de sentimento em lote
+SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', 2000))
+SENTIMENT_PROCESS_THRESHOLD = int(os.getenv('SENTIMENT_PROCESS_THRESHOLD', 20000))
+SENTIMENT_PROCESS_WORKERS = int(os.getenv('SENTIMENT_PROCESS_WORKERS', os.cpu_count() or 1))
+
+_worker_sentiment_analyzer = None
+_sentiment_process_pool = None
+_sentiment_pool_lock = threading.Lock()
+
+def sentiment_label(compound):
+    if compound >= 0.05:
+        return 'positive'
+    elif compound <= -0.05:
+        return 'negative'
+    else:
+        return 'neutral'
+
+_shared_sentiment_analyzer = None
+_shared_sentiment_lock = threading.Lock()
+
+def get_sentiment_analyzer():
+    """VADER compartilhado pelo processo; o léxico é lido do disco uma única vez"""
+    global _shared_sentiment_analyzer
+    with _shared_sentiment_lock:
+        if _shared_sentiment_analyzer is None:
+            _shared_sentiment_analyzer = SentimentIntensityAnalyzer()
+        return _shared_sentiment_analyzer
+
+def _init_sentiment_worker():
+    global _worker_sentiment_analyzer
+    _worker_sentiment_analyzer = SentimentIntensityAnalyzer()
+
+def score_texts(texts, analyzer=None):
+    analyzer = analyzer or _worker_sentiment_analyzer
+    results = []
+    for text in texts:
+        compound = analyzer.polarity_scores(text)['compound']
+        results.append((sentiment_label(compound), compound))
+    return results
+
+def iter_batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+def get_sentiment_process_pool():
+    global _sentiment_process_pool
+    with _sentiment_pool_lock:
+        if _sentiment_process_pool is None:
+            # spawn: o processo do servidor tem várias threads, fork não é seguro
+            _sentiment_process_pool = ProcessPoolExecutor(
+                max_workers=SENTIMENT_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_sentiment_worker
+            )
+        return _sentiment_process_pool
+
+# Cache de sentimento por hash do texto normalizado
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', 200000))
+SENTIMENT_CACHE_PERSIST = os.getenv('SENTIMENT_CACHE_PERSIST', 'false').lower() == 'true'
+SENTIMENT_CACHE_DB_CHUNK = 500
+
+def sentiment_cache_key(text):
+    # Só espaços e a forma Unicode são normalizados: o VADER diferencia maiúsculas,
+    # pontuação e emojis, então eles precisam continuar fazendo parte da chave
+    normalized = ' '.join(unicodedata.normalize('NFC', text or '').split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    """LRU em memória com tabela persistente opcional (sentiment_cache_entry)"""
+
+    def __init__(self, max_size=SENTIMENT_CACHE_SIZE, persist=SENTIMENT_CACHE_PERSIST):
+        self.max_size = max_size
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = value
+                    
+        missing = [key for key in keys if key not in found]
+        if missing and self.persist and has_app_context():
+            stored = {}
+            for chunk in iter_batches(missing, SENTIMENT_CACHE_DB_CHUNK):
+                for entry in SentimentCacheEntry.query.filter(SentimentCacheEntry.text_hash.in_(chunk)):
+                    stored[entry.text_hash] = (entry.sentiment, entry.compound)
+            with self._lock:
+                self.persistent_hits += len(stored)
+            self._remember(stored)
+            found.update(stored)
+        return found
+
+    def put_many(self, entries):
+        self._remember(entries)
+        if entries and self.persist and has_app_context():
+            rows = [{'text_hash': key, 'sentiment': sentiment, 'compound': compound}
+                    for key, (sentiment, compound) in entries.items()]
+            statement = insert_ignore(SentimentCacheEntry.__table__)
+            with db.engine.begin() as conn:
+                for chunk in iter_batches(rows, SENTIMENT_CACHE_DB_CHUNK):
+                    conn.execute(statement, chunk)
+
+    def _remember(self, entries):
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'persistent': self.persist,
+                'hits': self.hits,
+                'misses': self.misses,
+                'persistent_hits': self.persistent_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+sentiment_cache = SentimentCache()
+
+class SentimentAggregate:
+    """Contagem de sentimentos acumulada à medida que os lotes de comentários são processados"""
+
+    def __init__(self, positive=0, neutral=0, negative=0):
+        self.counts = {
+            'positive': positive or 0,
+            'neutral': neutral or 0,
+            'negative': negative or 0
+        }
+
+    def add(self, comments):
+        for comment in comments:
+            self.counts[comment['sentiment']] += 1
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+# Gráficos de sentimento
+CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', 256))
+CHART_KINDS = ('pie', 'bar')
+SENTIMENT_COLORS = ['#4CAF50', '#FFC107', '#F44336']
+
+class ChartRenderer:
+    """Renderiza os gráficos com a API de Figure (sem o estado global do pyplot) e guarda os PNGs por contagem"""
+
+    def __init__(self, max_size=CHART_CACHE_SIZE):
+        self.max_size = max_size
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def counts_key(sentiment_counts):
+        counts = [int(sentiment_counts.get(label) or 0) for label in ('positive', 'neutral', 'negative')]
+        return hashlib.sha1(','.join(map(str, counts)).encode('utf-8')).hexdigest()
+
+    def etag(self, kind, sentiment_counts):
+        return f"{kind}-{self.counts_key(sentiment_counts)}"
+
+    def render(self, kind, sentiment_counts):
+        if kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        key = (kind, self.counts_key(sentiment_counts))
+        with self._lock:
+            png = self._charts.get(key)
+            if png is not None:
+                self._charts.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+            
+        counts = {label: int(sentiment_counts.get(label) or 0) for label in ('positive', 'neutral', 'negative')}
+        png = self._render_pie(counts) if kind == 'pie' else self._render_bar(counts)
+        
+        with self._lock:
+            self._charts[key] = png
+            while len(self._charts) > self.max_size:
+                self._charts.popitem(last=False)
+        return png
+
+    def render_all(self, sentiment_counts):
+        return {kind: self.render(kind, sentiment_counts) for kind in CHART_KINDS}
+
+    def _to_png(self, fig):
+        FigureCanvasAgg(fig)
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+    def _render_pie(self, sentiment_counts):
+        fig = Figure(figsize=(10, 5))
+        ax = fig.add_subplot()
+        ax.pie(
+            sentiment_counts.values(),
+            labels=sentiment_counts.keys(),
+            autopct='%1.1f%%',
+            startangle=140,
+            colors=SENTIMENT_COLORS
+        )
+        ax.set_title('Comment Sentiment Distribution')
+        return self._to_png(fig)
+
+    def _render_bar(self, sentiment_counts):
+        fig = Figure(figsize=(10, 5))
+        ax = fig.add_subplot()
+        sns.barplot(
+            x=list(sentiment_counts.keys()),
+            y=list(sentiment_counts.values()),
+            hue=list(sentiment_counts.keys()),
+            palette=SENTIMENT_COLORS,
+            legend=False,
+            ax=ax
         )
+        ax.set_title('Comment Sentiment Analysis')
+        ax.set_xlabel('Sentiment')
+        ax.set_ylabel('Count')
+        return self._to_png(fig)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._charts),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+chart_renderer = ChartRenderer()
+
+def video_from_item(video):
+    return {
+        'id': video['id'],
+        'title': video['snippet']['title'],
+        'views': int(video['statistics'].get('viewCount', 0)),
+        'likes': int(video['statistics'].get('likeCount', 0)),
+        'comments': int(video['statistics'].get('commentCount', 0)),
+        'published_at': video['snippet']['publishedAt'],
+        'thumbnail': video['snippet']['thumbnails']['high']['url'],
+        'description': video['snippet'].get('description', '')
+    }
+
+def comment_from_item(item, video_id):
+    comment = item['snippet']['topLevelComment']['snippet']
+    return {
+        'id': item['id'],
+        'video_id': video_id,
+        'author': comment['authorDisplayName'],
+        'text': comment['textDisplay'],
+        'likes': int(comment['likeCount']),
+        'published_at': comment['publishedAt']
+    }
+
+def parse_comment_page(response, video_id, since=None):
+    """Comentários da página até o primeiro já visto (since); retorna (comentários, encontrou_visto)"""
+    page = []
+    for item in response.get('items', []):
+        comment = item['snippet']['topLevelComment']['snippet']
+        if since and (item['id'] == since[0] or utc_naive(comment['publishedAt']) < since[1]):
+            return page, True
+        page.append(comment_from_item(item, video_id))
+    return page, False
+
+def has_public_comments(video_response):
+    """Resposta de videos.list (statistics,status): o vídeo existe, tem comentários e é incorporável"""
+    if not video_response.get('items'):
+        return False
+    video_data = video_response['items'][0]
+    if int(video_data['statistics'].get('commentCount', 0)) == 0:
+        return False
+    return video_data['status'].get('embeddable', False)
+
+class AsyncYouTubeFetcher:
+    """Buscas do YouTubeAnalyzer (mesmas saídas) feitas com asyncio no AsyncFetchEngine.
+
+    Usa a quota, o rate limiter, as métricas e o progresso do analisador que a criou.
+    A playlist de uploads continua sendo paginada em sequência, mas os detalhes dos vídeos
+    e a paginação de comentários de todos os vídeos ficam em andamento ao mesmo tempo.
+    """
+
+    def __init__(self, analyzer, engine):
+        self.analyzer = analyzer
+        self.engine = engine
+
+    def run(self, coro):
+        return self.engine.run(coro)
+
+    async def report(self, **counts):
+        """Progresso do analisador numa thread do executor: o flush do JobProgress grava no banco
+        e não pode parar o loop compartilhado por todos os jobs"""
+        if self.analyzer.progress:
+            await asyncio.get_running_loop().run_in_executor(None, partial(self.analyzer._report, **counts))
+
+    async def execute(self, resource, **params):
+        endpoint = f"{resource}.list"
+        analyzer = self.analyzer
+        while True:
+            key = analyzer.key_pool.acquire(endpoint)
+            with analyzer.timings.stage('rate_limit_wait'):
+                await analyzer.rate_limiter.acquire_async()
+            start = time.perf_counter()
+            try:
+                return await self.engine.get(resource, params, key)
+            except HttpError as e:
+                metrics.inc('youtube_api_errors_total', endpoint=endpoint,
+                            reason='quotaExceeded' if is_quota_error(e) else str(e.status_code))
+                if not is_quota_error(e):
+                    raise
+            finally:
+                analyzer._record_api_call(endpoint, key, time.perf_counter() - start)
+            analyzer.key_pool.mark_exhausted(key)
+
+    async def upload_video_id_pages(self, playlist_id, page_size=50):
+        next_page_token = None
+        while True:
+            playlist_response = await self.execute(
+                'playlistItems',
+                playlistId=playlist_id,
+                part="contentDetails",
+                maxResults=page_size,
+                pageToken=next_page_token
+            )
+            
+            video_ids = [item['contentDetails']['videoId'] for item in playlist_response.get('items', [])]
+            if video_ids:
+                yield video_ids
+                
+            next_page_token = playlist_response.get('nextPageToken')
+            if not next_page_token:
+                break
+
+    async def video_details(self, video_ids):
+        videos_response = await self.execute('videos', id=",".join(video_ids), part="snippet,statistics")
+        await self.report(videos=len(videos_response.get('items', [])))
+        return [video_from_item(video) for video in videos_response.get('items', [])]
+
+    async def fetch_videos(self, playlist_id, known=frozenset(), max_videos=None):
+        """Vídeos da playlist até o primeiro já conhecido (ou max_videos), na ordem da playlist"""
+        tasks = []
+        requested = 0
+        try:
+            async for video_ids in self.upload_video_id_pages(playlist_id):
+                new_video_ids = [vid for vid in video_ids if vid not in known]
+                if new_video_ids:
+                    tasks.append(asyncio.ensure_future(self.video_details(new_video_ids)))
+                    requested += len(new_video_ids)
+                if len(new_video_ids) < len(video_ids) or (max_videos and requested >= max_videos):
+                    break
+            pages = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return [video for page in pages for video in page]
+
+    async def comment_pages(self, video_id, since, deliver):
+        """Mesmo fluxo de iter_comment_pages; cada página é entregue à corrotina deliver"""
+        video_response = await self.execute('videos', part="statistics,status", id=video_id)
+        if not has_public_comments(video_response):
+            return
+            
+        next_page_token = None
+        while True:
+            try:
+                comments_response = await self.execute(
+                    'commentThreads',
+                    videoId=video_id,
+                    part="snippet",
+                    maxResults=100,
+                    order="time",
+                    pageToken=next_page_token,
+                    textFormat="plainText"
+                )
+            except HttpError as e:
+                if "commentsDisabled" in str(e):
+                    return
+                raise
+                
+            page, reached_seen = parse_comment_page(comments_response, video_id, since)
+            await self.report(comments=len(page))
+            if page:
+                await deliver(page)
+                
+            next_page_token = comments_response.get('nextPageToken')
+            if reached_seen or not next_page_token:
+                break
+
+    async def collect_comments(self, video_id, since=None):
+        comments = []
+        
+        async def keep(page):
+            comments.extend(page)
+            
+        await self.comment_pages(video_id, since, keep)
+        return comments
+
+    async def produce_comment_pages(self, video_ids, marks, pages, stop, failed):
+        """Pagina os comentários de todos os vídeos ao mesmo tempo e entrega as páginas na fila
+        (None ao fim de cada vídeo), como as threads de busca de iter_scored_comment_batches;
+        os vídeos cuja paginação falhou no meio vão para failed"""
+        async def put(page):
+            while not stop.is_set():
+                try:
+                    pages.put_nowait(page)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+        
+        async def fetch(video_id):
+            start = time.perf_counter()
+            waited = 0.0
+            
+            async def deliver(page):
+                nonlocal waited
+                put_start = time.perf_counter()
+                await put(page)
+                waited += time.perf_counter() - put_start
+                
+            try:
+                await self.comment_pages(video_id, marks.get(video_id), deliver)
+            except QuotaExhaustedError:
+                raise
+            except Exception as e:
+                logging.error(f"Error getting all comments for video {video_id}: {str(e)}")
+                failed.add(video_id)
+            finally:
+                self.analyzer.timings.add('comment_paging', time.perf_counter() - start - waited)
+                await put(None)
+        
+        results = await asyncio.gather(*(fetch(video_id) for video_id in video_ids), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+class YouTubeAnalyzer:
+    def __init__(self, progress=None, rate_limiter=None, fetch_workers=None, key_pool=None, cache=None,
+                 sentiment_analyzer=None, timings=None, fetch_engine=None, async_engine=None):
+        self.analyzer = sentiment_analyzer or get_sentiment_analyzer()
+        self.progress = progress
+        self.timings = timings or StageTimings()
+        self.rate_limiter = rate_limiter or youtube_rate_limiter
+        self.key_pool = key_pool or youtube_key_pool
+        self.sentiment_cache = cache or sentiment_cache
+        self.fetch_workers = fetch_workers or COMMENT_FETCH_WORKERS
+        self.async_fetcher = None
+        if (fetch_engine or YOUTUBE_FETCH_ENGINE) == 'async' and httpx is not None:
+            self.async_fetcher = AsyncYouTubeFetcher(self, async_engine or youtube_async_engine)
+
+    def _report(self, phase=None, videos=0, comments=0):
+        if self.progress:
+            self.progress.update(phase=phase, videos=videos, comments=comments)
+
+    def _execute(self, resource, **params):
+        """Executa <resource>.list com a próxima chave disponível, trocando de chave se a quota acabar"""
+        endpoint = f"{resource}.list"
+        while True:
+            key = self.key_pool.acquire(endpoint)
+            with self.timings.stage('rate_limit_wait'):
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            with self.key_pool.service(key) as youtube:
+                try:
+                    return getattr(youtube, resource)().list(**params).execute()
+                except HttpError as e:
+                    metrics.inc('youtube_api_errors_total', endpoint=endpoint,
+                                reason='quotaExceeded' if is_quota_error(e) else str(e.status_code))
+                    if not is_quota_error(e):
+                        raise
+                finally:
+                    self._record_api_call(endpoint, key, time.perf_counter() - start)
+            self.key_pool.mark_exhausted(key)
+
+    def _record_api_call(self, endpoint, key, seconds):
+        units = QUOTA_COSTS.get(endpoint, 1)
+        label = self.key_pool.label(key)
+        metrics.inc('youtube_api_calls_total', endpoint=endpoint, key=label)
+        metrics.inc('youtube_quota_units_total', units, endpoint=endpoint, key=label)
+        metrics.observe('youtube_api_call_seconds', seconds, endpoint=endpoint)
+        self.timings.record_api_call(endpoint, units)
     
     def get_channel_info(self, channel_name):
-        youtube = self.get_youtube_service()
         try:
             search_query = channel_name.replace(' ', '+')
             logging.info(f"Searching for channel: {channel_name}")
             
-            search_response = youtube.search().list(
+            search_response = self._execute(
+                'search',
                 q=search_query,
                 part="snippet",
                 type="channel",
                 maxResults=1
-            ).execute()
+            )
             
             if not search_response.get('items'):
                 logging.error(f"No channel found for query: {search_query}")
                 return None
                 
             channel = search_response['items'][0]
-            channel_id = channel['id']['channelId']
+            return self.get_channel_info_by_id(channel['id']['channelId'])
             
-            channels_response = youtube.channels().list(
+        except QuotaExhaustedError:
+            raise
+        except Exception as e:
+            logging.error(f"Error getting channel info: {str(e)}")
+            return None
+
+    def get_channel_info_by_id(self, channel_id):
+        """Dados atuais de um canal já resolvido (1 unidade de quota, sem o search.list)"""
+        try:
+            channels_response = self._execute(
+                'channels',
                 id=channel_id,
-                part="snippet,statistics"
-            ).execute()
+                part="snippet,statistics,contentDetails"
+            )
             
+            if not channels_response.get('items'):
+                logging.error(f"No channel found for id: {channel_id}")
+                return None
+                
             channel_data = channels_response['items'][0]
             return {
                 'id': channel_id,
+                'uploads_playlist_id': channel_data['contentDetails']['relatedPlaylists']['uploads'],
                 'title': channel_data['snippet']['title'],
                 'subscribers': int(channel_data['statistics']['subscriberCount']),
                 'video_count': int(channel_data['statistics']['videoCount']),
@@ -198,59 +1247,103 @@ class YouTubeAnalyzer:
                 'description': channel_data['snippet'].get('description', '')
             }
             
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logging.error(f"Error getting channel info: {str(e)}")
             return None
 
-    def get_all_videos(self, channel_id):
-        youtube = self.get_youtube_service()
-        videos = []
+    def get_uploads_playlist_id(self, channel_id):
+        channels_response = self._execute(
+            'channels',
+            id=channel_id,
+            part="contentDetails"
+        )
+        
+        if not channels_response.get('items'):
+            return None
+        return channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+
+    def get_channels_statistics(self, channel_ids, batch_size=50):
+        """videoCount e playlist de uploads de vários canais (50 IDs por chamada, 1 unidade de quota)"""
+        channels = {}
+        for batch in iter_batches(channel_ids, batch_size):
+            channels_response = self._execute(
+                'channels',
+                id=",".join(batch),
+                part="statistics,contentDetails",
+                maxResults=batch_size
+            )
+            for item in channels_response.get('items', []):
+                channels[item['id']] = {
+                    'video_count': int(item['statistics'].get('videoCount', 0)),
+                    'uploads_playlist_id': item['contentDetails']['relatedPlaylists']['uploads']
+                }
+        return channels
+
+    def get_latest_upload_id(self, uploads_playlist_id):
+        """Vídeo mais recente do canal: o topo da playlist de uploads (1 unidade de quota)"""
+        playlist_response = self._execute(
+            'playlistItems',
+            playlistId=uploads_playlist_id,
+            part="contentDetails",
+            maxResults=1
+        )
+        items = playlist_response.get('items', [])
+        return items[0]['contentDetails']['videoId'] if items else None
+
+    def iter_upload_video_ids(self, channel_id, uploads_playlist_id=None, page_size=50):
+        """Percorre a playlist de uploads do canal, do mais recente ao mais antigo (1 unidade de quota por página)"""
+        playlist_id = uploads_playlist_id or self.get_uploads_playlist_id(channel_id)
+        if not playlist_id:
+            return
+            
         next_page_token = None
+        while True:
+            playlist_response = self._execute(
+                'playlistItems',
+                playlistId=playlist_id,
+                part="contentDetails",
+                maxResults=page_size,
+                pageToken=next_page_token
+            )
+            
+            video_ids = [item['contentDetails']['videoId'] for item in playlist_response.get('items', [])]
+            if video_ids:
+                yield video_ids
+                
+            next_page_token = playlist_response.get('nextPageToken')
+            if not next_page_token:
+                break
+
+    def get_all_videos(self, channel_id, uploads_playlist_id=None):
+        videos = []
         
         try:
-            while True:
-                search_response = youtube.search().list(
-                    channelId=channel_id,
-                    part="id",
-                    maxResults=50,
-                    order="date",
-                    pageToken=next_page_token,
-                    type="video"
-                ).execute()
-                
-                video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
+            if self.async_fetcher:
+                playlist_id = uploads_playlist_id or self.get_uploads_playlist_id(channel_id)
+                return self.async_fetcher.run(self.async_fetcher.fetch_videos(playlist_id)) if playlist_id else []
                 
+            for video_ids in self.iter_upload_video_ids(channel_id, uploads_playlist_id):
                 if video_ids:
-                    videos_response = youtube.videos().list(
+                    videos_response = self._execute(
+                        'videos',
                         id=",".join(video_ids),
                         part="snippet,statistics"
-                    ).execute()
+                    )
                     
-                    for video in videos_response.get('items', []):
-                        videos.append({
-                            'id': video['id'],
-                            'title': video['snippet']['title'],
-                            'views': int(video['statistics'].get('viewCount', 0)),
-                            'likes': int(video['statistics'].get('likeCount', 0)),
-                            'comments': int(video['statistics'].get('commentCount', 0)),
-                            'published_at': video['snippet']['publishedAt'],
-                            'thumbnail': video['snippet']['thumbnails']['high']['url'],
-                            'description': video['snippet'].get('description', '')
-                        })
-                
-                next_page_token = search_response.get('nextPageToken')
-                if not next_page_token:
-                    break
-                    
-                time.sleep(1)
+                    self._report(videos=len(videos_response.get('items', [])))
+                    videos.extend(video_from_item(video) for video in videos_response.get('items', []))
             
             return videos
             
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logging.error(f"Error getting all videos: {str(e)}")
             return None
 
-    def get_new_videos_only(self, channel_id, user_id, max_videos=100):
+    def get_new_videos_only(self, channel_id, user_id, max_videos=100, uploads_playlist_id=None):
         """Obtém apenas vídeos novos desde a última análise"""
         # Verifica se já existe cache para este canal
         cached_videos = VideoCache.query.filter_by(
@@ -258,232 +1351,327 @@ class YouTubeAnalyzer:
             channel_id=channel_id
         ).order_by(VideoCache.last_updated.desc()).all()
         
-        youtube = self.get_youtube_service()
         videos = []
-        next_page_token = None
         new_videos = []
+        existing_videos = {v.video_id for v in cached_videos}
         
         try:
-            # Busca os vídeos mais recentes
-            while len(videos) < max_videos:
-                search_response = youtube.search().list(
-                    channelId=channel_id,
-                    part="id",
-                    maxResults=50,
-                    order="date",
-                    pageToken=next_page_token,
-                    type="video"
-                ).execute()
-                
-                video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-                
-                if not video_ids:
-                    break
+            if self.async_fetcher:
+                playlist_id = uploads_playlist_id or self.get_uploads_playlist_id(channel_id)
+                if playlist_id:
+                    new_videos = self.async_fetcher.run(
+                        self.async_fetcher.fetch_videos(playlist_id, existing_videos, max_videos)
+                    )
+            else:
+                # Busca os vídeos mais recentes
+                for video_ids in self.iter_upload_video_ids(channel_id, uploads_playlist_id):
+                    # Verifica quais vídeos já estão no cache
+                    new_video_ids = [vid for vid in video_ids if vid not in existing_videos]
                     
-                # Verifica quais vídeos já estão no cache
-                existing_videos = {v.video_id for v in cached_videos}
-                new_video_ids = [vid for vid in video_ids if vid not in existing_videos]
-                
-                if new_video_ids:
-                    # Busca detalhes apenas dos vídeos novos
-                    videos_response = youtube.videos().list(
-                        id=",".join(new_video_ids),
-                        part="snippet,statistics"
-                    ).execute()
+                    if new_video_ids:
+                        # Busca detalhes apenas dos vídeos novos
+                        videos_response = self._execute(
+                            'videos',
+                            id=",".join(new_video_ids),
+                            part="snippet,statistics"
+                        )
                     
-                    for video in videos_response.get('items', []):
-                        video_data = {
-                            'id': video['id'],
-                            'title': video['snippet']['title'],
-                            'views': int(video['statistics'].get('viewCount', 0)),
-                            'likes': int(video['statistics'].get('likeCount', 0)),
-                            'comments': int(video['statistics'].get('commentCount', 0)),
-                            'published_at': video['snippet']['publishedAt'],
-                            'thumbnail': video['snippet']['thumbnails']['high']['url'],
-                            'description': video['snippet'].get('description', '')
-                        }
-                        new_videos.append(video_data)
-                        videos.append(video_data)
-                
-                next_page_token = search_response.get('nextPageToken')
-                if not next_page_token or len(videos) >= max_videos:
-                    break
+                        self._report(videos=len(videos_response.get('items', [])))
+                        for video in videos_response.get('items', []):
+                            video_data = video_from_item(video)
+                            new_videos.append(video_data)
+                            videos.append(video_data)
                     
-                time.sleep(1)
-            
-            # Se não há vídeos novos, retorna os mais recentes do cache
-            if not new_videos and cached_videos:
-                cached_videos = cached_videos[:max_videos]
-                return [{
-                    'id': v.video_id,
-                    **v.analysis_data
-                } for v in cached_videos], []
+                    # A playlist vem do mais recente ao mais antigo: ao encontrar vídeos já
+                    # conhecidos, o restante do canal já está no cache
+                    if len(new_video_ids) < len(video_ids) or len(videos) >= max_videos:
+                        break
             
-            # Combina novos vídeos com cache existente (mantendo limite de max_videos)
+            # Combina novos vídeos com todo o cache existente; max_videos limita só os vídeos novos buscados
             combined_videos = new_videos + [{
                 'id': v.video_id,
                 **v.analysis_data
             } for v in cached_videos]
             
-            return combined_videos[:max_videos], new_videos
+            return combined_videos, new_videos
             
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logging.error(f"Error getting new videos: {str(e)}")
             return None, None
 
-    def get_all_comments(self, video_id):
-        youtube = self.get_youtube_service()
-        comments = []
+    def refresh_video_statistics(self, videos, batch_size=50):
+        """Busca de novo views/curtidas/comentários dos vídeos conhecidos (50 IDs por chamada, 1 unidade de quota)"""
+        refreshed = []
+        for batch in iter_batches(videos, batch_size):
+            videos_response = self._execute(
+                'videos',
+                id=",".join(video['id'] for video in batch),
+                part="statistics"
+            )
+            statistics = {item['id']: item['statistics'] for item in videos_response.get('items', [])}
+            self._report(videos=len(statistics))
+            
+            # Vídeos removidos ou privados não voltam na resposta e saem da análise
+            for video in batch:
+                if video['id'] in statistics:
+                    refreshed.append({
+                        **video,
+                        'views': int(statistics[video['id']].get('viewCount', 0)),
+                        'likes': int(statistics[video['id']].get('likeCount', 0)),
+                        'comments': int(statistics[video['id']].get('commentCount', 0))
+                    })
+        return refreshed
+
+    def iter_comment_pages(self, video_id, since=None):
+        """Gera as páginas de comentários de um vídeo, ainda sem análise de sentimento.
+        
+        Com since=(comment_id, published_at) os comentários vêm do mais novo para o mais
+        antigo (order=time) e a paginação para no primeiro comentário já visto.
+        """
+        video_response = self._execute(
+            'videos',
+            part="statistics,status",
+            id=video_id
+        )
+        
+        if not has_public_comments(video_response):
+            return
+
         next_page_token = None
+        while True:
+            try:
+                comments_response = self._execute(
+                    'commentThreads',
+                    videoId=video_id,
+                    part="snippet",
+                    maxResults=100,
+                    order="time",
+                    pageToken=next_page_token,
+                    textFormat="plainText"
+                )
+            except HttpError as e:
+                if "commentsDisabled" in str(e):
+                    return
+                raise
+
+            page, reached_seen = parse_comment_page(comments_response, video_id, since)
+            self._report(comments=len(page))
+            if page:
+                yield page
+
+            next_page_token = comments_response.get('nextPageToken')
+            if reached_seen or not next_page_token:
+                break
+
+    def get_all_comments(self, video_id, since=None):
+        comments = []
         
         try:
-            video_response = youtube.videos().list(
-                part="statistics,status",
-                id=video_id
-            ).execute()
+            if self.async_fetcher:
+                comments = self.async_fetcher.run(self.async_fetcher.collect_comments(video_id, since))
+            else:
+                for page in self.iter_comment_pages(video_id, since):
+                    comments.extend(page)
             
-            if not video_response.get('items'):
-                return None
-                
-            video_data = video_response['items'][0]
-            if 'commentCount' not in video_data['statistics'] or int(video_data['statistics']['commentCount']) == 0:
+            if not comments:
                 return None
                 
-            if not video_data['status'].get('embeddable', False):
-                return None
-
-            while True:
-                try:
-                    comments_response = youtube.commentThreads().list(
-                        videoId=video_id,
-                        part="snippet",
-                        maxResults=100,
-                        pageToken=next_page_token,
-                        textFormat="plainText"
-                    ).execute()
-                except HttpError as e:
-                    if "commentsDisabled" in str(e):
-                        return None
-                    raise
-
-                items = comments_response.get('items', [])
-                
-                for item in items:
-                    comment = item['snippet']['topLevelComment']['snippet']
-                    comments.append({
-                        'id': item['id'],
-                        'video_id': video_id,
-                        'author': comment['authorDisplayName'],
-                        'text': comment['textDisplay'],
-                        'likes': int(comment['likeCount']),
-                        'published_at': comment['publishedAt'],
-                        'sentiment': self.analyze_sentiment(comment['textDisplay'])
-                    })
-
-                next_page_token = comments_response.get('nextPageToken')
-                if not next_page_token:
-                    break
-                    
-                time.sleep(1.2)
-            
+            self.score_comments(comments)
             return comments
 
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logging.error(f"Error getting all comments: {str(e)}")
             return None
 
-    def analyze_sentiment(self, text):
-        scores = self.analyzer.polarity_scores(text)
-        if scores['compound'] >= 0.05:
-            return 'positive'
-        elif scores['compound'] <= -0.05:
-            return 'negative'
-        else:
-            return 'neutral'
-    
-    def generate_charts(self, comments):
-        sentiment_counts = {
-            'positive': 0,
-            'neutral': 0,
-            'negative': 0
-        }
-    
-        for comment in comments:
-            sentiment_counts[comment['sentiment']] += 1
+    def iter_scored_comment_batches(self, video_ids, marks=None, failed=None):
+        """Gera lotes de comentários já com sentimento, buscando vários vídeos em paralelo.
+
+        A busca (I/O de rede) e a análise de sentimento (CPU) são estágios separados:
+        as threads de busca entregam páginas numa fila limitada e o consumidor as pontua
+        em lotes enquanto as demais páginas ainda estão sendo baixadas. Com mais de um
+        processo de sentimento, os lotes vão para o pool sem bloquear o consumidor.
+        Como a fila é limitada, a memória usada não depende do tamanho do canal.
         
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.pie(
-            sentiment_counts.values(),
-            labels=sentiment_counts.keys(),
-            autopct='%1.1f%%',
-            startangle=140,
-            colors=['#4CAF50', '#FFC107', '#F44336']
-        )
-        ax.set_title('Comment Sentiment Distribution')
-        pie_buffer = BytesIO()
-        plt.savefig(pie_buffer, format='png')
-        pie_buffer.seek(0)
-        pie_chart = base64.b64encode(pie_buffer.getvalue()).decode('utf-8')
-        plt.close(fig)
-    
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.barplot(
-            x=list(sentiment_counts.keys()),
-            y=list(sentiment_counts.values()),
-            hue=list(sentiment_counts.keys()),
-            palette=['#4CAF50', '#FFC107', '#F44336'],
-            legend=False
-        )
-        ax.set_title('Comment Sentiment Analysis')
-        ax.set_xlabel('Sentiment')
-        ax.set_ylabel('Count')
-        bar_buffer = BytesIO()
-        plt.savefig(bar_buffer, format='png')
-        bar_buffer.seek(0)
-        bar_chart = base64.b64encode(bar_buffer.getvalue()).decode('utf-8')
-        plt.close(fig)
+        marks (video_id -> (comment_id, published_at)) limita a busca aos comentários novos.
+        Os vídeos cuja paginação falhou no meio (erro que não é de quota) são adicionados a
+        failed: seus comentários ficaram incompletos e a marca deles não deve avançar.
+        """
+        marks = marks or {}
+        failed = set() if failed is None else failed
+        workers = max(1, self.fetch_workers)
+        pages = queue.Queue(maxsize=workers * COMMENT_QUEUE_PAGES_PER_WORKER)
+        stop = threading.Event()
         
-        return pie_chart, bar_chart, sentiment_counts
-    
-    def analyze_channel_complete(self, channel_name):
-        start_time = datetime.now()
+        def put(page):
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
         
-        channel_info = self.get_channel_info(channel_name)
-        if not channel_info:
-            return None
+        def fetch(video_id):
+            # Tempo de paginação do vídeo, sem contar a espera por espaço na fila
+            start = time.perf_counter()
+            waited = 0.0
+            try:
+                for page in self.iter_comment_pages(video_id, marks.get(video_id)):
+                    if stop.is_set():
+                        return
+                    put_start = time.perf_counter()
+                    put(page)
+                    waited += time.perf_counter() - put_start
+            except QuotaExhaustedError:
+                raise
+            except Exception as e:
+                logging.error(f"Error getting all comments for video {video_id}: {str(e)}")
+                failed.add(video_id)
+            finally:
+                self.timings.add('comment_paging', time.perf_counter() - start - waited)
+                put(None)
+        
+        video_ids = list(video_ids)
+        if self.async_fetcher:
+            # Uma corrotina por vídeo no loop do motor assíncrono, no lugar das threads
+            futures = [self.async_fetcher.engine.submit(
+                self.async_fetcher.produce_comment_pages(video_ids, marks, pages, stop, failed)
+            )]
+            shutdown = futures[0].cancel
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='comment-fetch')
+            futures = [executor.submit(fetch, video_id) for video_id in video_ids]
+            shutdown = partial(executor.shutdown, wait=True, cancel_futures=True)
+        # Com o pool de processos, até um lote por processo é pontuado enquanto o próximo se forma
+        scoring = deque()
+        use_pool = SENTIMENT_PROCESS_WORKERS > 1
+        try:
+            pending_videos = len(video_ids)
+            while pending_videos:
+                batch = []
+                page = pages.get()
+                # Junta as páginas que já chegaram para pontuar em lote
+                while True:
+                    if page is None:
+                        pending_videos -= 1
+                    else:
+                        batch.extend(page)
+                    if len(batch) >= SENTIMENT_BATCH_SIZE or pages.empty():
+                        break
+                    page = pages.get()
+                    
+                if not batch:
+                    continue
+                if not use_pool:
+                    yield self.score_comments(batch)
+                    continue
+                scoring.append(self.submit_score_comments(batch))
+                # Lotes saem na ordem em que entraram
+                if len(scoring) >= SENTIMENT_PROCESS_WORKERS:
+                    yield scoring.popleft()()
             
-        videos = self.get_all_videos(channel_info['id'])
-        if not videos:
-            return None
+            while scoring:
+                yield scoring.popleft()()
             
-        all_comments = []
-        for video in videos:
-            comments = self.get_all_comments(video['id'])
-            if comments:
-                all_comments.extend(comments)
-            time.sleep(1)
+            for future in futures:
+                future.result()
+        finally:
+            # Consumidor parou (fim, erro ou generator fechado): libera as threads de busca
+            stop.set()
+            shutdown()
+
+    def score_comments(self, comments):
+        for comment, (sentiment, _) in zip(comments, self.analyze_sentiments(c['text'] for c in comments)):
+            comment['sentiment'] = sentiment
+        return comments
+
+    def submit_score_comments(self, comments):
+        """score_comments sem bloquear, para o pipeline de comentários.
+
+        Os textos inéditos vão para o pool de processos e a busca continua enquanto são
+        pontuados; a função devolvida espera o pool e preenche o sentimento dos comentários.
+        """
+        with self.timings.stage('sentiment_scoring'):
+            keys, unique_texts, found, missing = self._lookup_sentiments(c['text'] for c in comments)
+            if missing:
+                future = get_sentiment_process_pool().submit(score_texts, [unique_texts[key] for key in missing])
         
-        pie_chart, bar_chart, sentiment_stats = self.generate_charts(all_comments)
+        def result():
+            with self.timings.stage('sentiment_scoring'):
+                scored = future.result() if missing else []
+            for comment, (sentiment, _) in zip(comments, self._store_sentiments(keys, found, missing, scored)):
+                comment['sentiment'] = sentiment
+            return comments
+        return result
+
+    def analyze_sentiments(self, texts):
+        """Analisa um lote (lista ou iterador) de textos; retorna uma lista de (sentimento, compound).
+
+        Textos repetidos (no lote ou já vistos antes) vêm do cache de sentimento;
+        só os inéditos passam pelo VADER.
+        """
+        with self.timings.stage('sentiment_scoring'):
+            keys, unique_texts, found, missing = self._lookup_sentiments(texts)
+            scored = self._score_uncached([unique_texts[key] for key in missing]) if missing else []
+        return self._store_sentiments(keys, found, missing, scored)
+
+    def _lookup_sentiments(self, texts):
+        keys = []
+        unique_texts = {}
+        for text in texts:
+            key = sentiment_cache_key(text)
+            keys.append(key)
+            unique_texts.setdefault(key, text)
+            
+        found = self.sentiment_cache.get_many(list(unique_texts))
+        missing = [key for key in unique_texts if key not in found]
+        return keys, unique_texts, found, missing
+
+    def _store_sentiments(self, keys, found, missing, scored):
+        if missing:
+            scored = dict(zip(missing, scored))
+            self.sentiment_cache.put_many(scored)
+            found.update(scored)
+        self.sentiment_cache.record(hits=len(keys) - len(missing), misses=len(missing))
         
-        return {
-            'channel_info': channel_info,
-            'videos': {
-                'count': len(videos),
-                'all_videos': videos,
-            },
-            'comments': {
-                'count': len(all_comments),
-                'all_comments': all_comments,
-            },
-            'sentiment_analysis': {
-                'pie_chart': pie_chart,
-                'bar_chart': bar_chart,
-                'stats': sentiment_stats
-            },
-            'execution_time': str(datetime.now() - start_time)
-        }
+        return [found[key] for key in keys]
+
+    def _score_uncached(self, texts):
+        """Lotes com pelo menos SENTIMENT_PROCESS_THRESHOLD textos são divididos entre os processos do pool"""
+        if len(texts) < SENTIMENT_PROCESS_THRESHOLD or SENTIMENT_PROCESS_WORKERS <= 1:
+            return score_texts(texts, self.analyzer)
+            
+        results = []
+        pool = get_sentiment_process_pool()
+        for scored in pool.map(score_texts, iter_batches(texts, SENTIMENT_BATCH_SIZE)):
+            results.extend(scored)
+        return results
+
+    def analyze_sentiment(self, text):
+        return self.analyze_sentiments([text])[0][0]
+
+def init_youtube_analyzer(app):
+    """Prepara no início da aplicação o que antes era refeito a cada requisição"""
+    get_sentiment_analyzer()
+    youtube_discovery_document()
+    youtube_key_pool.warm()
+    app.extensions['youtube_analyzer'] = YouTubeAnalyzer()
+    return app.extensions['youtube_analyzer']
+
+def get_youtube_analyzer():
+    """Analisador compartilhado pela aplicação (sem progresso; os jobs criam o seu)"""
+    analyzer = app.extensions.get('youtube_analyzer')
+    if analyzer is None:
+        analyzer = app.extensions.setdefault('youtube_analyzer', YouTubeAnalyzer())
+    return analyzer
 
 # JWT Token
+def decode_token(token):
+    return jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -492,7 +1680,7 @@ def token_required(f):
             return jsonify({'message': 'Token missing!'}), 401
             
         try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+            data = decode_token(token)
             current_user = db.session.get(User, data['user_id'])
             if not current_user:
                 raise ValueError("User not found")
@@ -503,6 +1691,127 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
     return decorated
 
+# Cache de respostas dos endpoints do dashboard
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 2000))
+
+class ResponseCache:
+    """Guarda as respostas por usuário e URL.
+
+    O ETag vem só da versão das análises do usuário lida do banco (analysis_validator), então é o
+    mesmo em todos os workers e continua válido depois de um restart.
+    """
+
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+
+    def etag(self, user_id, path, validator):
+        return hashlib.sha1(f"{validator}:{user_id}:{path}".encode('utf-8')).hexdigest()
+
+    def get(self, user_id, path, etag):
+        with self._lock:
+            cached = self._responses.get((user_id, path))
+            if cached is None or cached[0] != etag:
+                self.misses += 1
+                return None
+            self._responses.move_to_end((user_id, path))
+            self.hits += 1
+            return cached[1]
+
+    def put(self, user_id, path, etag, body):
+        with self._lock:
+            self._responses[(user_id, path)] = (etag, body)
+            self._responses.move_to_end((user_id, path))
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._responses),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'not_modified': self.not_modified,
+                'misses': self.misses
+            }
+
+response_cache = ResponseCache()
+
+def analysis_validator_query(user_id):
+    return select(
+        User.id,
+        func.count(Analysis.id),
+        func.max(Analysis.id),
+        func.max(Analysis.analysis_date),
+        func.sum(Analysis.video_count),
+        func.sum(Analysis.total_views),
+        func.sum(Analysis.total_comments),
+        func.sum(Analysis.positive_comments),
+        func.sum(Analysis.negative_comments)
+    ).select_from(User)\
+        .outerjoin(Analysis, and_(Analysis.user_id == User.id, Analysis.status == 'completed'))\
+        .where(User.id == user_id)\
+        .group_by(User.id)
+
+def analysis_validator(user_id):
+    """Versão das análises concluídas do usuário (uma consulta agregada); None se o usuário não existe.
+
+    Muda com gravações feitas por qualquer processo, inclusive UPDATEs diretos fora do ORM. É a única
+    consulta de um 304; comentários já gravados nunca mudam (insert_ignore), só entram por novas análises.
+    """
+    row = db.session.execute(analysis_validator_query(user_id)).first()
+    return ':'.join(str(value) for value in row[1:]) if row else None
+
+def cached_response(f=None, *, daily=False):
+    """Responde 304 pelo If-None-Match ou devolve a resposta guardada sem rodar a rota.
+
+    Rotas com período relativo a hoje usam daily=True: o dia (UTC) entra na chave e no ETag.
+    """
+    if f is None:
+        return partial(cached_response, daily=daily)
+        
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            user_id = decode_token(request.headers.get('x-access-token', ''))['user_id']
+            validator = analysis_validator(user_id)
+        except Exception:
+            validator = None
+        if validator is None:
+            # token_required responde com 401
+            return f(*args, **kwargs)
+            
+        path = request.full_path
+        if daily:
+            path = f"{path}#{datetime.now(timezone.utc).date().isoformat()}"
+        etag = response_cache.etag(user_id, path, validator)
+        if etag in request.if_none_match:
+            response_cache.record_not_modified()
+            response = app.response_class(status=304)
+        else:
+            body = response_cache.get(user_id, path, etag)
+            if body is not None:
+                response = app.response_class(body, mimetype='application/json')
+            else:
+                response = app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response_cache.put(user_id, path, etag, response.get_data())
+                
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    return decorated
+
 # Serviço de Email automatizado
 def send_email(to_email, verification_code):
     from_email = os.getenv('EMAIL_USER')
@@ -731,176 +2040,969 @@ def reset_password():
         logging.error(f"Password reset error: {str(e)}", exc_info=True)
         return jsonify({'message': 'Password reset failed', 'error': str(e)}), 500
 
-@app.route('/api/analyze-channel-complete', methods=['POST'])
+# Persistência em lote
+BULK_INSERT_BATCH_SIZE = int(os.getenv('BULK_INSERT_BATCH_SIZE', 1000))
+
+def parse_youtube_datetime(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+def utc_naive(value):
+    """Data do YouTube em UTC sem fuso, como é lida de volta do banco"""
+    parsed = parse_youtube_datetime(value)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed else None
+
+def bulk_insert(model, rows, batch_size=None, commit=True):
+    """Insere dicts em lotes (executemany), com uma transação por lote; commit=False deixa tudo na transação atual"""
+    total = 0
+    for chunk in iter_batches(rows, batch_size or BULK_INSERT_BATCH_SIZE):
+        db.session.execute(insert(model), chunk)
+        if commit:
+            db.session.commit()
+        total += len(chunk)
+    return total
+
+def video_rows(analysis_id, videos):
+    for video in videos:
+        yield {
+            'analysis_id': analysis_id,
+            'video_id': video['id'],
+            'title': video['title'],
+            'views': video['views'],
+            'likes': video['likes'],
+            'comments': video['comments'],
+            'published_at': parse_youtube_datetime(video['published_at'])
+        }
+
+def comment_rows(analysis_id, comments):
+    for comment in comments:
+        yield {
+            'analysis_id': analysis_id,
+            'youtube_comment_id': comment.get('id'),
+            'video_id': comment.get('video_id', ''),
+            'author': comment['author'],
+            'text': comment['text'],
+            'likes': comment['likes'],
+            'sentiment': comment['sentiment'],
+            'published_at': parse_youtube_datetime(comment['published_at'])
+        }
+
+def insert_ignore(target):
+    """INSERT que ignora linhas com chave duplicada (MySQL e SQLite)"""
+    return insert(target)\
+        .prefix_with('IGNORE', dialect='mysql')\
+        .prefix_with('OR IGNORE', dialect='sqlite')
+
+def store_comments(analysis_id, comments, batch_size=None):
+    """Grava apenas os comentários ainda não armazenados (pelo ID do YouTube) e liga todos à análise.
+    
+    Retorna os comentários que ainda não estavam ligados à análise.
+    """
+    linked = []
+    for chunk in iter_batches(comments, batch_size or BULK_INSERT_BATCH_SIZE):
+        by_youtube_id = {comment['id']: comment for comment in chunk}
+        
+        def existing_ids():
+            return dict(
+                db.session.query(CommentAnalysis.youtube_comment_id, CommentAnalysis.id)
+                .filter(CommentAnalysis.youtube_comment_id.in_(list(by_youtube_id)))
+            )
+        
+        comment_ids = existing_ids()
+        new_comments = [comment for youtube_id, comment in by_youtube_id.items() if youtube_id not in comment_ids]
+        if new_comments:
+            # IGNORE cobre outro job gravando o mesmo comentário ao mesmo tempo
+            db.session.execute(insert_ignore(CommentAnalysis), list(comment_rows(analysis_id, new_comments)))
+            comment_ids = existing_ids()
+        
+        already_linked = set(
+            comment_id for (comment_id,) in db.session.query(analysis_comments.c.comment_id).filter(
+                analysis_comments.c.analysis_id == analysis_id,
+                analysis_comments.c.comment_id.in_(list(comment_ids.values()))
+            )
+        )
+        db.session.execute(
+            insert_ignore(analysis_comments),
+            [{'analysis_id': analysis_id, 'comment_id': comment_id} for comment_id in comment_ids.values()]
+        )
+        db.session.commit()
+        linked.extend(
+            by_youtube_id[youtube_id] for youtube_id, comment_id in comment_ids.items()
+            if comment_id not in already_linked
+        )
+    return linked
+
+def link_analysis_comments(source_analysis_id, target_analysis_id):
+    """Liga à nova análise todos os comentários de uma análise anterior, sem copiá-los"""
+    previous_links = db.select(
+        literal(target_analysis_id),
+        analysis_comments.c.comment_id
+    ).where(analysis_comments.c.analysis_id == source_analysis_id)
+    db.session.execute(
+        analysis_comments.insert().from_select(['analysis_id', 'comment_id'], previous_links)
+    )
+    db.session.commit()
+
+def track_newest_comments(newest, comments):
+    """Atualiza newest (video_id -> (comment_id, published_at)) com o comentário mais novo de cada vídeo"""
+    for comment in comments:
+        published_at = utc_naive(comment['published_at'])
+        current = newest.get(comment['video_id'])
+        if published_at and (current is None or published_at > current[1]):
+            newest[comment['video_id']] = (comment['id'], published_at)
+    return newest
+
+def load_high_water_marks(user_id, analysis_id, video_ids):
+    """Marcas dos vídeos que já estão na análise (seus comentários antigos já estão ligados a ela)"""
+    marks = {}
+    for chunk in iter_batches(list(video_ids), BULK_INSERT_BATCH_SIZE):
+        rows = db.session.query(CommentHighWaterMark)\
+            .join(VideoAnalysis, and_(
+                VideoAnalysis.video_id == CommentHighWaterMark.video_id,
+                VideoAnalysis.analysis_id == analysis_id
+            ))\
+            .filter(CommentHighWaterMark.user_id == user_id, CommentHighWaterMark.video_id.in_(chunk))
+        for mark in rows:
+            marks[mark.video_id] = (mark.comment_id, mark.published_at)
+    return marks
+
+def save_high_water_marks(user_id, newest):
+    """Avança as marcas dos vídeos (não faz commit)"""
+    for chunk in iter_batches(list(newest.items()), BULK_INSERT_BATCH_SIZE):
+        existing = {
+            mark.video_id: mark for mark in CommentHighWaterMark.query.filter(
+                CommentHighWaterMark.user_id == user_id,
+                CommentHighWaterMark.video_id.in_([video_id for video_id, _ in chunk])
+            )
+        }
+        for video_id, (comment_id, published_at) in chunk:
+            mark = existing.get(video_id)
+            if mark is None:
+                db.session.add(CommentHighWaterMark(
+                    user_id=user_id, video_id=video_id, comment_id=comment_id, published_at=published_at
+                ))
+            elif published_at > mark.published_at:
+                mark.comment_id = comment_id
+                mark.published_at = published_at
+
+def completed_analyses():
+    return Analysis.query.filter(Analysis.status == 'completed')
+
+def analysis_comments_query(analysis_id):
+    return CommentAnalysis.query\
+        .join(analysis_comments, analysis_comments.c.comment_id == CommentAnalysis.id)\
+        .filter(analysis_comments.c.analysis_id == analysis_id)
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort_key, descending, value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_key, 'desc' if descending else 'asc', value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort_key, descending, column):
+    """Valida o cursor contra a ordenação pedida e devolve (valor, id) da última linha da página anterior"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_key, direction, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if cursor_key != sort_key or direction != ('desc' if descending else 'asc') or not isinstance(row_id, int):
+            raise InvalidCursor('Cursor does not match the requested ordering')
+        if value is not None and isinstance(column.type, db.DateTime):
+            value = datetime.fromisoformat(value)
+        return value, row_id
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+
+def keyset_page(query, sort_key, sort_column, id_column, cursor=None, limit=50, descending=True):
+    """Página ordenada por (sort_column, id); NULLs ficam por último em ordem decrescente e primeiro na crescente"""
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key, descending, sort_column)
+        if descending:
+            if value is None:
+                condition = and_(sort_column.is_(None), id_column < last_id)
+            else:
+                condition = or_(
+                    sort_column < value,
+                    and_(sort_column == value, id_column < last_id),
+                    sort_column.is_(None)
+                )
+        else:
+            if value is None:
+                condition = or_(and_(sort_column.is_(None), id_column > last_id), sort_column.isnot(None))
+            else:
+                condition = or_(sort_column > value, and_(sort_column == value, id_column > last_id))
+        query = query.filter(condition)
+        
+    ordering = (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, descending, getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+def count_comments_by_video(analysis_id):
+    """Número de comentários por vídeo de uma análise, numa única consulta agrupada"""
+    rows = analysis_comments_query(analysis_id)\
+        .with_entities(CommentAnalysis.video_id, func.count())\
+        .group_by(CommentAnalysis.video_id)
+    return {video_id: count for video_id, count in rows}
+
+ROLLUP_METRICS = (
+    'subscriber_count', 'video_count', 'total_views', 'total_likes', 'total_comments',
+    'positive_comments', 'neutral_comments', 'negative_comments'
+)
+
+def write_analysis_rollup(analysis, total_likes):
+    """Grava os totais da análise e recalcula o rollup diário do canal (não faz commit)"""
+    rollup = db.session.get(AnalysisRollup, analysis.id) or AnalysisRollup(analysis_id=analysis.id)
+    rollup.user_id = analysis.user_id
+    rollup.channel_id = analysis.channel_id
+    rollup.analysis_date = analysis.analysis_date or datetime.utcnow()
+    rollup.subscriber_count = analysis.subscriber_count or 0
+    rollup.video_count = analysis.video_count or 0
+    rollup.total_views = analysis.total_views or 0
+    rollup.total_likes = total_likes or 0
+    rollup.total_comments = analysis.total_comments or 0
+    rollup.positive_comments = analysis.positive_comments or 0
+    rollup.neutral_comments = analysis.neutral_comments or 0
+    rollup.negative_comments = analysis.negative_comments or 0
+    db.session.add(rollup)
+    db.session.flush()
+    refresh_channel_daily_rollup(rollup.user_id, rollup.channel_id, rollup.analysis_date.date())
+    return rollup
+
+def refresh_channel_daily_rollup(user_id, channel_id, day):
+    day_start = datetime.combine(day, datetime.min.time())
+    rollups = AnalysisRollup.query.filter(
+        AnalysisRollup.user_id == user_id,
+        AnalysisRollup.channel_id == channel_id,
+        AnalysisRollup.analysis_date >= day_start,
+        AnalysisRollup.analysis_date < day_start + timedelta(days=1)
+    ).order_by(AnalysisRollup.analysis_date.desc()).all()
+    if not rollups:
+        return None
+        
+    daily = db.session.get(ChannelDailyRollup, (user_id, channel_id, day)) or \
+        ChannelDailyRollup(user_id=user_id, channel_id=channel_id, day=day)
+    daily.analysis_count = len(rollups)
+    for metric in ROLLUP_METRICS:
+        setattr(daily, metric, getattr(rollups[0], metric))
+    db.session.add(daily)
+    return daily
+
+def video_cache_rows(user_id, channel_id, videos, incomplete=()):
+    """Linhas do VideoCache; os vídeos em incomplete ficam marcados para ter os comentários buscados de novo"""
+    for video in videos:
+        yield {
+            'user_id': user_id,
+            'channel_id': channel_id,
+            'video_id': video['id'],
+            'analysis_data': {
+                'title': video['title'],
+                'views': video['views'],
+                'likes': video['likes'],
+                'comments': video['comments'],
+                'published_at': video['published_at'],
+                'thumbnail': video.get('thumbnail', ''),
+                'description': video.get('description', ''),
+                'comments_incomplete': video['id'] in incomplete
+            }
+        }
+
+# Fila de análises em segundo plano
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', 4))
+ANALYSIS_MODES = ('incremental', 'refresh')
+PROGRESS_FLUSH_INTERVAL = 1.0
+
+class FairJobQueue:
+    """Fila dos jobs de análise com rodízio entre usuários.
+
+    Cada usuário tem sua fila FIFO e os workers pegam um job de cada usuário por vez:
+    um lote com dezenas de canais não atrasa as análises dos outros usuários.
+    """
+
+    def __init__(self, handler, workers=ANALYSIS_WORKERS):
+        self.handler = handler
+        self.workers = workers
+        self._queues = OrderedDict()
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def submit(self, owner, job_id):
+        with self._condition:
+            self._queues.setdefault(owner, deque()).append(job_id)
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'analysis-job-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+
+    def _next(self):
+        with self._condition:
+            while not self._queues:
+                self._condition.wait()
+            owner, jobs = self._queues.popitem(last=False)
+            job_id = jobs.popleft()
+            if jobs:
+                # Volta para o fim do rodízio
+                self._queues[owner] = jobs
+            return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._next()
+            try:
+                self.handler(job_id)
+            except Exception as e:
+                logging.error(f"Analysis job {job_id} crashed: {str(e)}", exc_info=True)
+
+    def pending(self):
+        with self._condition:
+            return {owner: len(jobs) for owner, jobs in self._queues.items()}
+
+class AnalysisError(Exception):
+    pass
+
+class JobProgress:
+    """Acumula o progresso de um job e persiste na tabela analysis_job periodicamente"""
+
+    def __init__(self, job_id, engine):
+        self.job_id = job_id
+        self.engine = engine
+        self.phase = 'queued'
+        self.videos = 0
+        self.comments = 0
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def update(self, phase=None, videos=0, comments=0):
+        with self._lock:
+            phase_changed = phase is not None and phase != self.phase
+            if phase is not None:
+                self.phase = phase
+            self.videos += videos
+            self.comments += comments
+            due = time.monotonic() - self._last_flush >= PROGRESS_FLUSH_INTERVAL
+        if phase_changed or due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            values = {
+                'phase': self.phase,
+                'videos_fetched': self.videos,
+                'comments_fetched': self.comments
+            }
+            self._last_flush = time.monotonic()
+        # Usa uma conexão própria: pode ser chamado de qualquer thread
+        with self.engine.begin() as conn:
+            conn.execute(
+                AnalysisJob.__table__.update()
+                .where(AnalysisJob.__table__.c.id == self.job_id)
+                .values(**values)
+            )
+
+def find_tracked_channel(user_id, channel_name):
+    return TrackedChannel.query.filter(
+        TrackedChannel.user_id == user_id,
+        or_(func.lower(TrackedChannel.channel_name) == channel_name.lower(), TrackedChannel.channel_id == channel_name)
+    ).first()
+
+def resolve_channel_info(analyzer, user_id, channel_name):
+    """Dados do canal reaproveitando o channel_id já resolvido para o usuário.
+
+    Só a primeira busca de um nome paga o search.list (100 unidades); depois basta o
+    channels.list (1 unidade). O canal resolvido passa a ser acompanhado (TrackedChannel).
+    """
+    tracked = find_tracked_channel(user_id, channel_name)
+    if tracked:
+        return analyzer.get_channel_info_by_id(tracked.channel_id)
+        
+    channel_info = analyzer.get_channel_info(channel_name)
+    if channel_info:
+        db.session.execute(insert_ignore(TrackedChannel.__table__).values(
+            user_id=user_id,
+            channel_id=channel_info['id'],
+            channel_name=channel_name,
+            title=channel_info['title'],
+            created_at=datetime.utcnow()
+        ))
+        db.session.commit()
+    return channel_info
+
+def run_channel_analysis(current_user, channel_name, progress=None, refresh=False):
+    analyzer = YouTubeAnalyzer(progress=progress)
+    timings = analyzer.timings
+    analyzer._report(phase='channel_lookup')
+    with timings.stage('channel_lookup'):
+        channel_info = resolve_channel_info(analyzer, current_user.id, channel_name)
+    if not channel_info:
+        raise AnalysisError('Channel not found')
+        
+    # Verifica se é primeira análise (sem cache)
+    is_first_analysis = not VideoCache.query.filter_by(
+        user_id=current_user.id,
+        channel_id=channel_info['id']
+    ).first()
+    
+    previous_analysis = completed_analyses().filter_by(
+        user_id=current_user.id,
+        channel_id=channel_info['id']
+    ).order_by(Analysis.analysis_date.desc()).first()
+    
+    analyzer._report(phase='fetching_videos')
+    if is_first_analysis:
+        # Análise completa: todos os vídeos do canal
+        with timings.stage('video_enumeration'):
+            all_videos = analyzer.get_all_videos(channel_info['id'], channel_info.get('uploads_playlist_id'))
+        if not all_videos:
+            raise AnalysisError('Channel analysis failed')
+        new_videos = all_videos
+        comment_videos = new_videos
+    elif refresh:
+        # Atualização: vídeos novos + estatísticas de todos os vídeos já conhecidos;
+        # os comentários só são buscados de novo onde o commentCount cresceu
+        with timings.stage('video_enumeration'):
+            _, new_videos = analyzer.get_new_videos_only(
+                channel_info['id'],
+                current_user.id,
+                uploads_playlist_id=channel_info.get('uploads_playlist_id')
+            )
+        if new_videos is None:
+            raise AnalysisError('Failed to get videos')
+            
+        new_video_ids = {video['id'] for video in new_videos}
+        known_videos = [
+            {'id': cached.video_id, **cached.analysis_data}
+            for cached in VideoCache.query.filter_by(user_id=current_user.id, channel_id=channel_info['id'])
+            if cached.video_id not in new_video_ids
+        ]
+        with timings.stage('video_enumeration'):
+            refreshed_videos = analyzer.refresh_video_statistics(known_videos)
+        
+        previous_comments = {video['id']: video.get('comments', 0) for video in known_videos}
+        grown_videos = [video for video in refreshed_videos if video['comments'] > previous_comments[video['id']]]
+        all_videos = new_videos + refreshed_videos
+        comment_videos = new_videos + grown_videos
+        
+        if not all_videos:
+            raise AnalysisError('Failed to get videos')
+    else:
+        # Análise otimizada - apenas vídeos novos
+        with timings.stage('video_enumeration'):
+            all_videos, new_videos = analyzer.get_new_videos_only(
+                channel_info['id'],
+                current_user.id,
+                uploads_playlist_id=channel_info.get('uploads_playlist_id')
+            )
+        
+        if not all_videos:
+            raise AnalysisError('Failed to get videos')
+        comment_videos = new_videos
+    
+    # Vídeos cuja paginação de comentários falhou numa análise anterior são buscados de novo
+    queued_video_ids = {video['id'] for video in comment_videos}
+    comment_videos = comment_videos + [
+        video for video in all_videos
+        if video.get('comments_incomplete') and video['id'] not in queued_video_ids
+    ]
+    
+    # A análise fica como running até todos os comentários serem gravados
+    analysis = Analysis(
+        user_id=current_user.id,
+        channel_id=channel_info['id'],
+        channel_name=channel_name,
+        subscriber_count=channel_info['subscribers'],
+        video_count=len(all_videos),
+        total_views=sum(v['views'] for v in all_videos),
+        status='running'
+    )
+    
+    with timings.stage('db_persistence'):
+        db.session.add(analysis)
+        db.session.commit()
+    
+    try:
+        with timings.stage('db_persistence'):
+            # Salva vídeos no banco
+            bulk_insert(VideoAnalysis, video_rows(analysis.id, all_videos))
+            
+            # Os comentários das análises anteriores são apenas ligados à nova análise
+            if not is_first_analysis and previous_analysis:
+                link_analysis_comments(previous_analysis.id, analysis.id)
+                
+        sentiment = SentimentAggregate()
+        if not is_first_analysis and previous_analysis:
+            sentiment = SentimentAggregate(
+                previous_analysis.positive_comments,
+                previous_analysis.neutral_comments,
+                previous_analysis.negative_comments
+            )
+        
+        # Busca -> sentimento -> agregados -> gravação, lote a lote
+        analyzer._report(phase='fetching_comments')
+        comment_video_ids = [video['id'] for video in comment_videos]
+        marks = {}
+        if previous_analysis and not is_first_analysis:
+            marks = load_high_water_marks(current_user.id, previous_analysis.id, comment_video_ids)
+        newest = {}
+        failed_videos = set()
+        new_comments = 0
+        fetched_comments = 0
+        for batch in analyzer.iter_scored_comment_batches(comment_video_ids, marks, failed_videos):
+            track_newest_comments(newest, batch)
+            # Só entram nos agregados os comentários que a análise ainda não tinha
+            with timings.stage('db_persistence'):
+                linked = store_comments(analysis.id, batch)
+            sentiment.add(linked)
+            new_comments += len(linked)
+            fetched_comments += len(batch)
+        metrics.inc('analysis_comments_processed_total', fetched_comments)
+        # Paginação interrompida: a marca não avança e a próxima análise busca de novo os comentários
+        for video_id in failed_videos:
+            newest.pop(video_id, None)
+        
+        # Os PNGs ficam no cache do renderizador e são servidos por /api/analysis/<id>/chart/<kind>.png
+        analyzer._report(phase='rendering_charts')
+        with timings.stage('chart_rendering'):
+            chart_renderer.render_all(sentiment.counts)
+        
+        analyzer._report(phase='saving')
+        with timings.stage('db_persistence'):
+            analysis.total_comments = sentiment.total
+            analysis.positive_comments = sentiment.counts['positive']
+            analysis.neutral_comments = sentiment.counts['neutral']
+            analysis.negative_comments = sentiment.counts['negative']
+            analysis.status = 'completed'
+            write_analysis_rollup(analysis, sum(v['likes'] for v in all_videos))
+            save_high_water_marks(current_user.id, newest)
+            
+            # O cache só passa a conhecer os vídeos novos junto com a conclusão da análise:
+            # se a busca de comentários falhar, a próxima análise incremental os busca de novo
+            VideoCache.query.filter_by(
+                user_id=current_user.id,
+                channel_id=channel_info['id']
+            ).delete()
+            bulk_insert(
+                VideoCache, video_cache_rows(current_user.id, channel_info['id'], all_videos, failed_videos), commit=False
+            )
+            
+            current_user.last_analysis = datetime.now(timezone.utc)
+            current_user.analysis_count += 1
+            TrackedChannel.query.filter_by(user_id=current_user.id, channel_id=channel_info['id'])\
+                .update({'last_analyzed_at': datetime.utcnow(), 'video_count': channel_info['video_count']})
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        analysis.status = 'failed'
+        db.session.commit()
+        raise
+    
+    return {
+        'analysis_id': analysis.id,
+        'optimized': not is_first_analysis,
+        'new_videos_analyzed': 0 if is_first_analysis else len(new_videos),
+        'refreshed': refresh and not is_first_analysis,
+        'videos_with_new_comments': len(comment_videos) - len(new_videos),
+        # Comentários incompletos (paginação falhou): entram de novo na próxima análise
+        'incomplete_videos': sorted(failed_videos),
+        'data': {
+            'channel_info': channel_info,
+            'videos_count': len(all_videos),
+            'comments_count': analysis.total_comments,
+            'new_comments_count': new_comments
+        },
+        'timings': timings.breakdown(comments=fetched_comments)
+    }
+
+def execute_analysis_job(job_id):
+    with app.app_context():
+        job = db.session.get(AnalysisJob, job_id)
+        if not job or job.status != 'queued':
+            return
+            
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        
+        progress = JobProgress(job.id, db.engine)
+        start = time.perf_counter()
+        try:
+            logging.info(f"Starting analysis job {job.id} for channel: {job.channel_name}")
+            user = db.session.get(User, job.user_id)
+            result = run_channel_analysis(user, job.channel_name, progress, refresh=job.mode == 'refresh')
+            progress.flush()
+            db.session.refresh(job)
+            job.status = 'completed'
+            job.phase = 'completed'
+            job.analysis_id = result['analysis_id']
+            job.result = result
+            if result['incomplete_videos']:
+                job.error = (f"Comments incomplete for {len(result['incomplete_videos'])} videos; "
+                             "they will be fetched again on the next analysis")
+                logging.warning(f"Analysis job {job.id}: {job.error}")
+        except Exception as e:
+            db.session.rollback()
+            if isinstance(e, AnalysisError):
+                logging.warning(f"Analysis job {job_id} failed: {str(e)}")
+            else:
+                logging.error(f"Analysis job {job_id} error: {str(e)}", exc_info=True)
+            progress.flush()
+            job = db.session.get(AnalysisJob, job_id)
+            job.status = 'failed'
+            job.phase = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            metrics.inc('analysis_jobs_total', status=job.status)
+            metrics.observe('analysis_job_seconds', time.perf_counter() - start, mode=job.mode)
+            db.session.remove()
+
+job_queue = FairJobQueue(lambda job_id: execute_analysis_job(job_id))
+
+def enqueue_analysis_job(job):
+    job_queue.submit(job.user_id, job.id)
+
+def recover_analysis_jobs():
+    """Reenfileira jobs pendentes e encerra os que foram interrompidos por um restart"""
+    interrupted = AnalysisJob.query.filter_by(status='running').all()
+    for job in interrupted:
+        job.status = 'failed'
+        job.phase = 'failed'
+        job.error = 'Interrupted by server restart'
+        job.finished_at = datetime.utcnow()
+    # As análises que esses jobs gravavam ficaram pela metade; job.analysis_id só é preenchido no fim
+    Analysis.query.filter_by(status='running').update({'status': 'failed'}, synchronize_session=False)
+    db.session.commit()
+    
+    for job in AnalysisJob.query.filter_by(status='queued').order_by(AnalysisJob.created_at).all():
+        enqueue_analysis_job(job)
+
+def active_jobs_query():
+    return AnalysisJob.query.filter(AnalysisJob.status.in_(('queued', 'running')))
+
+# Intervalo (segundos) entre as verificações dos canais acompanhados; 0 desliga o agendador
+CHANNEL_REFRESH_INTERVAL = float(os.getenv('CHANNEL_REFRESH_INTERVAL', 900))
+
+class ChannelRefreshScheduler:
+    """Verifica periodicamente os canais acompanhados e enfileira a análise incremental dos que publicaram vídeos.
+
+    Cada rodada custa 1 unidade de quota a cada 50 canais (videoCount pelo channels.list) e mais
+    1 unidade por canal cujo videoCount mudou desde a última análise (topo da playlist de uploads).
+    O job incremental pega todos os vídeos publicados desde a análise anterior, e o dashboard já
+    abre com a análise pronta.
+    """
+
+    def __init__(self, interval=CHANNEL_REFRESH_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='channel-refresh', daemon=True)
+        self._thread.start()
+        logging.info(f"Channel refresh scheduler started (every {self.interval:.0f}s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except QuotaExhaustedError as e:
+                logging.warning(f"Channel refresh skipped: {str(e)}")
+            except Exception as e:
+                logging.error(f"Channel refresh error: {str(e)}", exc_info=True)
+
+    def run_once(self):
+        start = time.perf_counter()
+        with app.app_context():
+            try:
+                return self.check_channels(get_youtube_analyzer())
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+                metrics.observe('channel_refresh_seconds', time.perf_counter() - start)
+
+    def check_channels(self, analyzer):
+        # Só os canais com alguma análise concluída; os demais ainda não têm base para o incremental
+        tracked = TrackedChannel.query.filter(TrackedChannel.last_analyzed_at.isnot(None)).all()
+        summary = {'checked': len(tracked), 'unchanged': 0, 'pending': 0, 'missing': 0, 'jobs': []}
+        if not tracked:
+            return summary
+
+        statistics = analyzer.get_channels_statistics(sorted({channel.channel_id for channel in tracked}))
+        latest_uploads = {}
+        for channel in tracked:
+            current = statistics.get(channel.channel_id)
+            if current and current['video_count'] != channel.video_count and channel.channel_id not in latest_uploads:
+                latest_uploads[channel.channel_id] = analyzer.get_latest_upload_id(current['uploads_playlist_id'])
+
+        active = {(job.user_id, job.channel_name.lower()) for job in active_jobs_query()}
+        now = datetime.utcnow()
+        jobs = []
+        for channel in tracked:
+            channel.last_checked_at = now
+            current = statistics.get(channel.channel_id)
+            if not current:
+                result = 'missing'
+            elif current['video_count'] == channel.video_count:
+                result = 'unchanged'
+            elif not latest_uploads[channel.channel_id] or VideoCache.query.filter_by(
+                user_id=channel.user_id,
+                channel_id=channel.channel_id,
+                video_id=latest_uploads[channel.channel_id]
+            ).first():
+                # videoCount mudou sem vídeo novo no topo (vídeo removido ou privado)
+                channel.video_count = current['video_count']
+                result = 'unchanged'
+            elif (channel.user_id, channel.channel_name.lower()) in active:
+                result = 'pending'
+            else:
+                jobs.append(AnalysisJob(user_id=channel.user_id, channel_name=channel.channel_name, mode='incremental'))
+                result = 'queued'
+            metrics.inc('channel_refresh_checks_total', result=result)
+            if result != 'queued':
+                summary[result] += 1
+
+        db.session.add_all(jobs)
+        db.session.commit()
+        for job in jobs:
+            enqueue_analysis_job(job)
+        if jobs:
+            logging.info(f"Channel refresh queued {len(jobs)} incremental analyses")
+        summary['jobs'] = [job.id for job in jobs]
+        return summary
+
+channel_refresh_scheduler = ChannelRefreshScheduler()
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'batch_id': job.batch_id,
+        'channel_name': job.channel_name,
+        'mode': job.mode,
+        'status': job.status,
+        'phase': job.phase,
+        'progress': {
+            'videos_fetched': job.videos_fetched or 0,
+            'comments_fetched': job.comments_fetched or 0
+        },
+        'analysis_id': job.analysis_id,
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+@app.route('/api/analyze-channel-complete', methods=['POST'])
+@token_required
+def analyze_channel_complete(current_user):
+    try:
+        data = request.get_json()
+        channel_name = unquote(data.get('channel_name', current_user.youtube_channel)).strip()
+        
+        if not channel_name:
+            return jsonify({'message': 'Channel name is required'}), 400
+            
+        mode = 'refresh' if data.get('refresh') else data.get('mode', 'incremental')
+        if mode not in ANALYSIS_MODES:
+            return jsonify({'message': f'Invalid analysis mode: {mode}'}), 400
+        
+        job = AnalysisJob(user_id=current_user.id, channel_name=channel_name, mode=mode)
+        db.session.add(job)
+        db.session.commit()
+        
+        enqueue_analysis_job(job)
+        logging.info(f"Queued analysis job {job.id} for channel: {channel_name}")
+        
+        return jsonify({
+            'message': 'Analysis queued',
+            'job_id': job.id,
+            'status_url': f'/api/jobs/{job.id}'
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Analysis error: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Analysis failed', 'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_job(current_user, job_id):
+    try:
+        job = AnalysisJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+        
+        if not job:
+            return jsonify({'message': 'Job not found'}), 404
+            
+        return jsonify(serialize_job(job)), 200
+    except Exception as e:
+        logging.error(f"Job fetch error: {str(e)}", exc_info=True)
+        return jsonify({
+            'message': 'Failed to fetch job',
+            'error': str(e)
+        }), 500
+
+MAX_BATCH_CHANNELS = int(os.getenv('MAX_BATCH_CHANNELS', 100))
+
+def batch_channel_names(channels):
+    """Nomes do lote sem repetições (ignorando maiúsculas), na ordem enviada.
+
+    Retorna None se alguma entrada não for um texto não vazio.
+    """
+    names = {}
+    for channel in channels:
+        if not isinstance(channel, str):
+            return None
+        name = unquote(channel).strip()
+        if not name:
+            return None
+        names.setdefault(name.lower(), name)
+    return list(names.values())
+
+def serialize_batch(batch):
+    jobs = [serialize_job(job) for job in batch.jobs]
+    statuses = [job['status'] for job in jobs]
+    if any(status in ('queued', 'running') for status in statuses):
+        status = 'running'
+    else:
+        status = 'failed' if statuses and all(status == 'failed' for status in statuses) else 'completed'
+    return {
+        'id': batch.id,
+        'mode': batch.mode,
+        'status': status,
+        'created_at': batch.created_at.isoformat() if batch.created_at else None,
+        'channels': len(jobs),
+        'jobs_by_status': {name: statuses.count(name) for name in ('queued', 'running', 'completed', 'failed')},
+        'progress': {
+            'videos_fetched': sum(job['progress']['videos_fetched'] for job in jobs),
+            'comments_fetched': sum(job['progress']['comments_fetched'] for job in jobs)
+        },
+        'jobs': jobs
+    }
+
+@app.route('/api/analyze-channels', methods=['POST'])
 @token_required
-def analyze_channel_complete(current_user):
+def analyze_channels_batch(current_user):
+    """Enfileira a análise de vários canais; os jobs dividem os workers, o rate limit e a quota"""
     try:
-        data = request.get_json()
-        channel_name = unquote(data.get('channel_name', current_user.youtube_channel)).strip()
-        
-        logging.info(f"Starting optimized analysis for channel: {channel_name}")
-        
-        analyzer = YouTubeAnalyzer()
-        channel_info = analyzer.get_channel_info(channel_name)
-        if not channel_info:
-            return jsonify({'message': 'Channel not found'}), 404
-            
-        # Verifica se é primeira análise (sem cache)
-        is_first_analysis = not VideoCache.query.filter_by(
-            user_id=current_user.id,
-            channel_id=channel_info['id']
-        ).first()
-        
-        if is_first_analysis:
-            # Análise completa (como antes)
-            results = analyzer.analyze_channel_complete(channel_name)
-            if not results:
-                return jsonify({'message': 'Channel analysis failed'}), 400
-        else:
-            # Análise otimizada - apenas vídeos novos
-            all_videos, new_videos = analyzer.get_new_videos_only(
-                channel_info['id'],
-                current_user.id
-            )
+        data = request.get_json() or {}
+        channels = data.get('channels')
+        if not isinstance(channels, list):
+            return jsonify({'message': 'A list of channels is required'}), 400
             
-            if not all_videos:
-                return jsonify({'message': 'Failed to get videos'}), 400
-                
-            all_comments = []
-            # Analisa apenas comentários dos vídeos novos
-            for video in new_videos:
-                comments = analyzer.get_all_comments(video['id'])
-                if comments:
-                    all_comments.extend(comments)
-                time.sleep(1)
-            
-            # Adiciona comentários do cache para os vídeos antigos
-            cached_comments = CommentAnalysis.query.join(Analysis)\
-                .filter(
-                    Analysis.user_id == current_user.id,
-                    Analysis.channel_id == channel_info['id']
-                ).all()
-            
-            all_comments.extend([{
-                'id': c.id,
-                'video_id': c.video_id,
-                'author': c.author,
-                'text': c.text,
-                'likes': c.likes,
-                'sentiment': c.sentiment,
-                'published_at': c.published_at.isoformat() if c.published_at else None
-            } for c in cached_comments])
+        channel_names = batch_channel_names(channels)
+        if not channel_names:
+            return jsonify({'message': 'A list of channels is required'}), 400
+        if len(channel_names) > MAX_BATCH_CHANNELS:
+            return jsonify({'message': f'At most {MAX_BATCH_CHANNELS} channels per batch'}), 400
             
-            pie_chart, bar_chart, sentiment_stats = analyzer.generate_charts(all_comments)
+        mode = 'refresh' if data.get('refresh') else data.get('mode', 'incremental')
+        if mode not in ANALYSIS_MODES:
+            return jsonify({'message': f'Invalid analysis mode: {mode}'}), 400
             
-            results = {
-                'channel_info': channel_info,
-                'videos': {
-                    'count': len(all_videos),
-                    'all_videos': all_videos,
-                },
-                'comments': {
-                    'count': len(all_comments),
-                    'all_comments': all_comments,
-                },
-                'sentiment_analysis': {
-                    'pie_chart': pie_chart,
-                    'bar_chart': bar_chart,
-                    'stats': sentiment_stats
-                }
-            }
-        
-        # Salva análise no banco de dados
-        analysis = Analysis(
-            user_id=current_user.id,
-            channel_id=results['channel_info']['id'],
-            channel_name=channel_name,
-            subscriber_count=results['channel_info']['subscribers'],
-            video_count=results['videos']['count'],
-            total_views=sum(v['views'] for v in results['videos']['all_videos']),
-            total_comments=results['comments']['count'],
-            positive_comments=results['sentiment_analysis']['stats']['positive'],
-            neutral_comments=results['sentiment_analysis']['stats']['neutral'],
-            negative_comments=results['sentiment_analysis']['stats']['negative'],
-            sentiment_pie_chart=results['sentiment_analysis']['pie_chart'],
-            sentiment_bar_chart=results['sentiment_analysis']['bar_chart']
-        )
-        
-        db.session.add(analysis)
+        batch = AnalysisBatch(user_id=current_user.id, mode=mode)
+        db.session.add(batch)
+        db.session.flush()
+        jobs = [
+            AnalysisJob(user_id=current_user.id, batch_id=batch.id, channel_name=name, mode=mode)
+            for name in channel_names
+        ]
+        db.session.add_all(jobs)
         db.session.commit()
         
-        # Atualiza o cache com os novos vídeos
-        if not is_first_analysis:
-            # Remove cache antigo
-            VideoCache.query.filter_by(
-                user_id=current_user.id,
-                channel_id=channel_info['id']
-            ).delete()
-            
-        # Adiciona todos os vídeos atuais ao cache
-        for video in results['videos']['all_videos']:
-            cache_entry = VideoCache(
-                user_id=current_user.id,
-                channel_id=channel_info['id'],
-                video_id=video['id'],
-                analysis_data={
-                    'title': video['title'],
-                    'views': video['views'],
-                    'likes': video['likes'],
-                    'comments': video['comments'],
-                    'published_at': video['published_at'],
-                    'thumbnail': video.get('thumbnail', ''),
-                    'description': video.get('description', '')
-                }
-            )
-            db.session.add(cache_entry)
-        
-        # Salva vídeos no banco
-        for video in results['videos']['all_videos']:
-            video_analysis = VideoAnalysis(
-                analysis_id=analysis.id,
-                video_id=video['id'],
-                title=video['title'],
-                views=video['views'],
-                likes=video['likes'],
-                comments=video['comments'],
-                published_at=datetime.fromisoformat(video['published_at'].replace('Z', '+00:00'))
-            )
-            db.session.add(video_analysis)
-        
-        # Salva comentários no banco
-        for comment in results['comments']['all_comments']:
-            comment_analysis = CommentAnalysis(
-                analysis_id=analysis.id,
-                video_id=comment.get('video_id', ''),
-                author=comment['author'],
-                text=comment['text'],
-                likes=comment['likes'],
-                sentiment=comment['sentiment'],
-                published_at=datetime.fromisoformat(comment['published_at'].replace('Z', '+00:00'))
-            )
-            db.session.add(comment_analysis)
+        for job in jobs:
+            enqueue_analysis_job(job)
+        logging.info(f"Queued analysis batch {batch.id} with {len(jobs)} channels")
         
-        db.session.commit()
+        return jsonify({
+            'message': 'Batch queued',
+            'batch_id': batch.id,
+            'status_url': f'/api/batches/{batch.id}',
+            'jobs': [{'job_id': job.id, 'channel_name': job.channel_name} for job in jobs]
+        }), 202
         
-        current_user.last_analysis = datetime.now(timezone.utc)
-        current_user.analysis_count += 1
-        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Batch analysis error: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Batch analysis failed', 'error': str(e)}), 500
+
+@app.route('/api/batches/<int:batch_id>', methods=['GET'])
+@token_required
+def get_batch(current_user, batch_id):
+    try:
+        batch = AnalysisBatch.query.filter_by(id=batch_id, user_id=current_user.id).first()
         
+        if not batch:
+            return jsonify({'message': 'Batch not found'}), 404
+            
+        return jsonify(serialize_batch(batch)), 200
+    except Exception as e:
+        logging.error(f"Batch fetch error: {str(e)}", exc_info=True)
         return jsonify({
-            'message': 'Analysis completed successfully',
-            'optimized': not is_first_analysis,
-            'new_videos_analyzed': len(new_videos) if not is_first_analysis else 0,
-            'data': {
-                'channel_info': results['channel_info'],
-                'videos_count': len(results['videos']['all_videos']),
-                'comments_count': len(results['comments']['all_comments'])
-            }
-        }), 200
-        
+            'message': 'Failed to fetch batch',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/sentiment-cache', methods=['GET'])
+@token_required
+def get_sentiment_cache_stats(current_user):
+    try:
+        return jsonify(sentiment_cache.stats()), 200
     except Exception as e:
-        logging.error(f"Analysis error: {str(e)}", exc_info=True)
-        return jsonify({'message': 'Analysis failed', 'error': str(e)}), 500
+        logging.error(f"Sentiment cache stats error: {str(e)}", exc_info=True)
+        return jsonify({
+            'message': 'Failed to fetch sentiment cache stats',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/quota', methods=['GET'])
+@token_required
+def get_quota(current_user):
+    try:
+        return jsonify(youtube_key_pool.stats()), 200
+    except Exception as e:
+        logging.error(f"Quota stats error: {str(e)}", exc_info=True)
+        return jsonify({
+            'message': 'Failed to fetch quota stats',
+            'error': str(e)
+        }), 500
+
+@metrics.collector
+def collect_cache_and_quota_metrics():
+    for name, stats in (('sentiment', sentiment_cache.stats()), ('chart', chart_renderer.stats()),
+                        ('response', response_cache.stats())):
+        lookups = stats['hits'] + stats['misses']
+        yield 'cache_hits_total', {'cache': name}, stats['hits']
+        yield 'cache_misses_total', {'cache': name}, stats['misses']
+        yield 'cache_hit_ratio', {'cache': name}, round(stats['hits'] / lookups, 4) if lookups else 0.0
+        yield 'cache_entries', {'cache': name}, stats['size']
+    for key in youtube_key_pool.stats()['keys']:
+        yield 'youtube_quota_remaining', {'key': key['key']}, key['remaining']
+
+@app.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    # Sem JWT (o Prometheus não tem usuário); com METRICS_TOKEN definido, exige "Authorization: Bearer <token>".
+    # Sem token configurado o endpoint fica aberto, então as séries por chave da API saem somadas
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'message': 'Unauthorized'}), 401
+    body = metrics.render(hidden_labels=() if token else ('key',))
+    return app.response_class(body, mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/api/user', methods=['GET'])
 @token_required
@@ -923,11 +3025,12 @@ def get_user(current_user):
         }), 500
 
 @app.route('/api/analyses', methods=['GET'])
+@cached_response
 @token_required
 def get_analyses(current_user):
     try:
         logging.info(f"Fetching analyses for user: {current_user.email}")
-        analyses = Analysis.query.filter_by(user_id=current_user.id)\
+        analyses = completed_analyses().filter_by(user_id=current_user.id)\
                                .order_by(Analysis.analysis_date.desc())\
                                .all()
         
@@ -951,51 +3054,81 @@ def get_analyses(current_user):
             'error': str(e)
         }), 500
 
+ANALYSIS_FIELDS = ('summary', 'sentiment', 'charts', 'videos', 'comments')
+ANALYSIS_VIDEO_SAMPLE = 10
+ANALYSIS_COMMENT_SAMPLE = 20
+
 @app.route('/api/analysis/<int:analysis_id>', methods=['GET'])
+@cached_response
 @token_required
 def get_analysis(current_user, analysis_id):
     try:
         logging.info(f"Fetching analysis {analysis_id} for user {current_user.id}")
-        analysis = Analysis.query.filter_by(id=analysis_id, user_id=current_user.id).first()
+        
+        # ?fields=summary,sentiment limita a resposta às seções pedidas
+        fields = request.args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(ANALYSIS_FIELDS)
+        unknown = [field for field in fields if field not in ANALYSIS_FIELDS]
+        if unknown:
+            return jsonify({'message': f"Unknown fields: {', '.join(unknown)}"}), 400
+            
+        analysis = completed_analyses().filter_by(id=analysis_id, user_id=current_user.id).first()
         
         if not analysis:
             return jsonify({'message': 'Analysis not found'}), 404
             
-        videos = [{
-            'id': v.video_id,
-            'title': v.title,
-            'views': v.views,
-            'likes': v.likes,
-            'comments': v.comments,
-            'published_at': v.published_at.isoformat() if v.published_at else None
-        } for v in analysis.videos]
-        
-        comments = [{
-            'author': c.author,
-            'text': c.text,
-            'likes': c.likes,
-            'sentiment': c.sentiment,
-            'published_at': c.published_at.isoformat() if c.published_at else None
-        } for c in analysis.comments]
+        result = {'id': analysis.id}
         
-        return jsonify({
-            'id': analysis.id,
-            'channel_name': analysis.channel_name,
-            'date': analysis.analysis_date.isoformat(),
-            'subscribers': analysis.subscriber_count,
-            'videos': analysis.video_count,
-            'views': analysis.total_views,
-            'comments': analysis.total_comments,
-            'sentiment': {
+        if 'summary' in fields:
+            result.update({
+                'channel_name': analysis.channel_name,
+                'date': analysis.analysis_date.isoformat(),
+                'subscribers': analysis.subscriber_count,
+                'videos': analysis.video_count,
+                'views': analysis.total_views,
+                'comments': analysis.total_comments
+            })
+            
+        if 'sentiment' in fields or 'charts' in fields:
+            result['sentiment'] = {}
+        if 'sentiment' in fields:
+            result['sentiment'].update({
                 'positive': analysis.positive_comments,
                 'neutral': analysis.neutral_comments,
-                'negative': analysis.negative_comments,
-                'pie_chart': analysis.sentiment_pie_chart,
-                'bar_chart': analysis.sentiment_bar_chart
-            },
-            'videos_sample': videos[:10],
-            'comments_sample': comments[:20]
-        }), 200
+                'negative': analysis.negative_comments
+            })
+        if 'charts' in fields:
+            # Os gráficos são servidos por /api/analysis/<id>/chart/<kind>.png
+            result['sentiment'].update({
+                f'{kind}_chart_url': f"/api/analysis/{analysis.id}/chart/{kind}.png" for kind in CHART_KINDS
+            })
+            
+        if 'videos' in fields:
+            videos = VideoAnalysis.query.filter_by(analysis_id=analysis.id)\
+                                      .order_by(VideoAnalysis.id)\
+                                      .limit(ANALYSIS_VIDEO_SAMPLE)
+            result['videos_sample'] = [{
+                'id': v.video_id,
+                'title': v.title,
+                'views': v.views,
+                'likes': v.likes,
+                'comments': v.comments,
+                'published_at': v.published_at.isoformat() if v.published_at else None
+            } for v in videos]
+            
+        if 'comments' in fields:
+            comments = analysis_comments_query(analysis.id)\
+                                      .order_by(CommentAnalysis.id)\
+                                      .limit(ANALYSIS_COMMENT_SAMPLE)
+            result['comments_sample'] = [{
+                'author': c.author,
+                'text': c.text,
+                'likes': c.likes,
+                'sentiment': c.sentiment,
+                'published_at': c.published_at.isoformat() if c.published_at else None
+            } for c in comments]
+        
+        return jsonify(result), 200
     except Exception as e:
         logging.error(f"Analysis fetch error: {str(e)}", exc_info=True)
         return jsonify({
@@ -1003,13 +3136,68 @@ def get_analysis(current_user, analysis_id):
             'error': str(e)
         }), 500
     
+@app.route('/api/analysis/<int:analysis_id>/chart/<kind>.png', methods=['GET'])
+@token_required
+def get_analysis_chart(current_user, analysis_id, kind):
+    if kind not in CHART_KINDS:
+        return jsonify({'message': 'Chart not found'}), 404
+        
+    try:
+        analysis = completed_analyses().filter_by(id=analysis_id, user_id=current_user.id).first()
+        if not analysis:
+            return jsonify({'message': 'Analysis not found'}), 404
+            
+        sentiment_counts = {
+            'positive': analysis.positive_comments,
+            'neutral': analysis.neutral_comments,
+            'negative': analysis.negative_comments
+        }
+        etag = chart_renderer.etag(kind, sentiment_counts)
+        if etag in request.if_none_match:
+            return '', 304, {'ETag': f'"{etag}"'}
+            
+        response = app.response_class(chart_renderer.render(kind, sentiment_counts), mimetype='image/png')
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.max_age = 3600
+        return response
+    except Exception as e:
+        logging.error(f"Chart render error: {str(e)}", exc_info=True)
+        return jsonify({
+            'message': 'Failed to render chart',
+            'error': str(e)
+        }), 500
+
+# Chaves de ordenação aceitas pelas rotas paginadas (?sort=<chave>&order=asc|desc)
+VIDEO_SORT_KEYS = {
+    'published_at': VideoAnalysis.published_at,
+    'views': VideoAnalysis.views,
+    'likes': VideoAnalysis.likes,
+    'comments': VideoAnalysis.comments
+}
+COMMENT_SORT_KEYS = {
+    'published_at': CommentAnalysis.published_at,
+    'likes': CommentAnalysis.likes,
+    'sentiment': CommentAnalysis.sentiment
+}
+MAX_PAGE_SIZE = 500
+COMMENTS_PAGE_SIZE = 100
+
+def page_arguments(sort_keys, default_limit):
+    sort_key = request.args.get('sort', 'published_at')
+    if sort_key not in sort_keys:
+        raise InvalidCursor(f"Invalid sort key: {sort_key}")
+    descending = request.args.get('order', 'desc').lower() != 'asc'
+    limit = max(1, min(request.args.get('per_page', default_limit, type=int), MAX_PAGE_SIZE))
+    return sort_key, descending, limit
+
 @app.route('/api/videos', methods=['GET'])
 @token_required
 def get_videos(current_user):
     try:
         logging.info(f"Fetching videos for user {current_user.id}")
         
-        last_analysis = Analysis.query.filter_by(user_id=current_user.id)\
+        last_analysis = completed_analyses().filter_by(user_id=current_user.id)\
                                     .order_by(Analysis.analysis_date.desc())\
                                     .first()
         
@@ -1021,18 +3209,29 @@ def get_videos(current_user):
                 'pagination': {}
             }), 200
             
-        videos = VideoAnalysis.query.filter_by(analysis_id=last_analysis.id)\
-                                  .order_by(VideoAnalysis.published_at.desc())\
-                                  .all()
+        sort_key, descending, per_page = page_arguments(VIDEO_SORT_KEYS, 5)
+        query = VideoAnalysis.query.filter_by(analysis_id=last_analysis.id)
+        total = query.count()
         
-        logging.info(f"Found {len(videos)} videos for analysis {last_analysis.id}")
-
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 5, type=int)
+        cursor = request.args.get('cursor')
+        page = request.args.get('page', type=int)
+        if page and page > 1 and not cursor:
+            # Compatibilidade com a paginação por número de página
+            sort_column = VIDEO_SORT_KEYS[sort_key]
+            ordering = (sort_column.desc(), VideoAnalysis.id.desc()) if descending else (sort_column.asc(), VideoAnalysis.id.asc())
+            paginated_videos = query.order_by(*ordering).offset((page - 1) * per_page).limit(per_page).all()
+            next_cursor = None
+            if paginated_videos and page * per_page < total:
+                last = paginated_videos[-1]
+                next_cursor = encode_cursor(sort_key, descending, getattr(last, sort_column.key), last.id)
+        else:
+            page = page or 1
+            paginated_videos, next_cursor = keyset_page(
+                query, sort_key, VIDEO_SORT_KEYS[sort_key], VideoAnalysis.id,
+                cursor=cursor, limit=per_page, descending=descending
+            )
         
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_videos = videos[start:end]
+        logging.info(f"Found {total} videos for analysis {last_analysis.id}")
         
         videos_data = [{
             'video_id': video.video_id,
@@ -1047,13 +3246,18 @@ def get_videos(current_user):
         return jsonify({
             'videos': videos_data,
             'pagination': {
-                'total': len(videos),
-                'pages': (len(videos) + per_page - 1) // per_page,
+                'total': total,
+                'pages': (total + per_page - 1) // per_page,
                 'current_page': page,
-                'per_page': per_page
+                'per_page': per_page,
+                'sort': sort_key,
+                'order': 'desc' if descending else 'asc',
+                'next_cursor': next_cursor
             }
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e), 'videos': []}), 400
     except Exception as e:
         logging.error(f"Error getting videos: {str(e)}", exc_info=True)
         return jsonify({
@@ -1071,7 +3275,8 @@ def get_video_metrics(current_user, video_id):
         video = VideoAnalysis.query.join(Analysis)\
                                  .filter(
                                      VideoAnalysis.video_id == video_id,
-                                     Analysis.user_id == current_user.id
+                                     Analysis.user_id == current_user.id,
+                                     Analysis.status == 'completed'
                                  )\
                                  .first()
 
@@ -1104,27 +3309,31 @@ def analyze_video_comments(current_user, video_id):
         logging.info(f"Analyzing comments for video {video_id}")
         
         # Busca os comentários no banco de dados
-        comments = CommentAnalysis.query.join(Analysis)\
-                                      .filter(
+        user_comment_ids = db.session.query(analysis_comments.c.comment_id)\
+                                     .join(Analysis, Analysis.id == analysis_comments.c.analysis_id)\
+                                     .filter(Analysis.user_id == current_user.id)
+        comments = CommentAnalysis.query.filter(
                                           CommentAnalysis.video_id == video_id,
-                                          Analysis.user_id == current_user.id
+                                          CommentAnalysis.id.in_(user_comment_ids)
                                       )\
                                       .all()
 
         if not comments:
             return jsonify({'message': 'No comments found'}), 404
 
-        analyzer = SentimentIntensityAnalyzer()
+        # Atualiza a análise de sentimento se necessário (em lote, usando o cache)
+        unscored = [comment for comment in comments if not comment.sentiment]
+        if unscored:
+            analyzer = get_youtube_analyzer()
+            scores = analyzer.analyze_sentiments(comment.text or '' for comment in unscored)
+            for comment, (sentiment, _) in zip(unscored, scores):
+                comment.sentiment = sentiment
+            db.session.commit()
+
         sentiment_counts = {'positive': 0, 'neutral': 0, 'negative': 0}
         analyzed_comments = []
 
         for comment in comments:
-            # Atualiza a análise de sentimento se necessário
-            if not comment.sentiment:
-                sentiment = analyzer.analyze_sentiment(comment.text)
-                comment.sentiment = sentiment
-                db.session.commit()
-            
             sentiment_counts[comment.sentiment] += 1
             analyzed_comments.append({
                 'id': comment.id,
@@ -1175,7 +3384,7 @@ def get_all_videos(current_user):
     try:
         logging.info(f"Fetching all videos for user {current_user.id}")
         
-        last_analysis = Analysis.query.filter_by(user_id=current_user.id)\
+        last_analysis = completed_analyses().filter_by(user_id=current_user.id)\
                                     .order_by(Analysis.analysis_date.desc())\
                                     .first()
         
@@ -1189,6 +3398,7 @@ def get_all_videos(current_user):
         videos = VideoAnalysis.query.filter_by(analysis_id=last_analysis.id)\
                                   .order_by(VideoAnalysis.published_at.desc())\
                                   .all()
+        comment_counts = count_comments_by_video(last_analysis.id)
         
         videos_data = [{
             'video_id': video.video_id,
@@ -1198,7 +3408,7 @@ def get_all_videos(current_user):
             'comments': video.comments,
             'published_at': video.published_at.isoformat() if video.published_at else None,
             'thumbnail': f'https://img.youtube.com/vi/{video.video_id}/hqdefault.jpg',
-            'comments_count': CommentAnalysis.query.filter_by(video_id=video.video_id).count()
+            'comments_count': comment_counts.get(video.video_id, 0)
         } for video in videos]
         
         return jsonify({
@@ -1224,7 +3434,8 @@ def get_video_comments(current_user, video_id):
                         .join(Analysis)\
                         .filter(
                             VideoAnalysis.video_id == video_id,
-                            Analysis.user_id == current_user.id
+                            Analysis.user_id == current_user.id,
+                            Analysis.status == 'completed'
                         )\
                         .first()
 
@@ -1237,14 +3448,16 @@ def get_video_comments(current_user, video_id):
                 'comments': []
             }), 404
 
-        comments = db.session.query(CommentAnalysis)\
-                          .filter(
-                              CommentAnalysis.video_id == video_id,
-                              CommentAnalysis.analysis_id == video.analysis_id
-                          )\
-                          .distinct(CommentAnalysis.id)\
-                          .order_by(CommentAnalysis.published_at.desc())\
-                          .all()
+        sort_key, descending, per_page = page_arguments(COMMENT_SORT_KEYS, COMMENTS_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        query = analysis_comments_query(video.analysis_id)\
+                          .filter(CommentAnalysis.video_id == video_id)
+        # O total só é contado na primeira página
+        total = None if cursor else query.count()
+        comments, next_cursor = keyset_page(
+            query, sort_key, COMMENT_SORT_KEYS[sort_key], CommentAnalysis.id,
+            cursor=cursor, limit=per_page, descending=descending
+        )
 
         logging.info(f"Encontrado{len(comments)}comentarios unicos para o vídeo {video_id}")
 
@@ -1258,7 +3471,7 @@ def get_video_comments(current_user, video_id):
                 'likes': comment.likes,
                 'sentiment': comment.sentiment,
                 'published_at': comment.published_at.isoformat() if comment.published_at else None,
-                'analysis_id': comment.analysis_id
+                'analysis_id': video.analysis_id
             })
 
         return jsonify({
@@ -1267,9 +3480,23 @@ def get_video_comments(current_user, video_id):
             'video_title': video.title,
             'analysis_id': video.analysis_id,
             'comments_count': len(comments_data),
-            'comments': comments_data
+            'comments': comments_data,
+            'pagination': {
+                'total': total,
+                'per_page': per_page,
+                'sort': sort_key,
+                'order': 'desc' if descending else 'asc',
+                'next_cursor': next_cursor
+            }
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'video_id': video_id,
+            'comments': []
+        }), 400
     except Exception as e:
         logging.error(f"Error getting video comments: {str(e)}", exc_info=True)
         return jsonify({
@@ -1294,15 +3521,15 @@ def check_channel_updates(current_user):
         if not channel_name:
             return jsonify({'message': 'Nome do canal não fornecido'}), 400
 
-        analyzer = YouTubeAnalyzer()
-        channel_info = analyzer.get_channel_info(channel_name)
+        analyzer = get_youtube_analyzer()
+        channel_info = resolve_channel_info(analyzer, current_user.id, channel_name)
         
         if not channel_info:
             logging.error(f"Canal não encontrado: {channel_name}")
             return jsonify({'message': 'Canal não encontrado'}), 404
             
         # Obter a última análise do banco de dados
-        last_analysis = Analysis.query.filter_by(
+        last_analysis = completed_analyses().filter_by(
             user_id=current_user.id,
             channel_id=channel_info['id']
         ).order_by(Analysis.analysis_date.desc()).first()
@@ -1328,25 +3555,31 @@ def check_channel_updates(current_user):
                 'requires_full_analysis': True
             }), 200
 
-        # Obter o último vídeo do YouTube
-        youtube = analyzer.get_youtube_service()
-        search_response = youtube.search().list(
-            channelId=channel_info['id'],
-            part="id,snippet",
-            maxResults=1,
-            order="date",
-            type="video"
-        ).execute()
-        
-        if not search_response.get('items'):
+        # Obter o último vídeo do YouTube (topo da playlist de uploads)
+        playlist_response = analyzer._execute(
+            'playlistItems',
+            playlistId=channel_info['uploads_playlist_id'],
+            part="snippet,contentDetails",
+            maxResults=1
+        )
+        
+        if not playlist_response.get('items'):
             logging.info("Nenhum vídeo encontrado no canal do YouTube")
             return jsonify({
                 'has_updates': False,
                 'message': 'Nenhum vídeo encontrado no canal'
             }), 200
             
-        last_video_yt = search_response['items'][0]
-        last_video_yt_id = last_video_yt['id']['videoId']
+        last_video_yt = playlist_response['items'][0]
+        last_video_yt_id = last_video_yt['contentDetails']['videoId']
+        
+        # Análise incremental já enfileirada pelo agendador (ou pelo usuário) para este canal
+        tracked = find_tracked_channel(current_user.id, channel_name)
+        job_names = {channel_name.lower(), tracked.channel_name.lower()} if tracked else {channel_name.lower()}
+        refresh_job = active_jobs_query().filter(
+            AnalysisJob.user_id == current_user.id,
+            func.lower(AnalysisJob.channel_name).in_(job_names)
+        ).order_by(AnalysisJob.id.desc()).first()
         
         # IDs
         logging.info(f"Último vídeo no banco: {last_video_db.video_id}")
@@ -1365,7 +3598,8 @@ def check_channel_updates(current_user):
             'last_video_title': last_video_yt['snippet']['title'],
             'requires_full_analysis': False,
             'db_video_id': last_video_db.video_id,
-            'yt_video_id': last_video_yt_id
+            'yt_video_id': last_video_yt_id,
+            'refresh_job_id': refresh_job.id if refresh_job else None
         }), 200
         
     except HttpError as e:
@@ -1396,41 +3630,25 @@ def analyze_new_videos(current_user):
         if not last_video_id:
             return jsonify({'message': 'Last video ID is required'}), 400
             
-        analyzer = YouTubeAnalyzer()
-        channel_info = analyzer.get_channel_info(channel_name)
+        analyzer = get_youtube_analyzer()
+        channel_info = resolve_channel_info(analyzer, current_user.id, channel_name)
         if not channel_info:
             return jsonify({'message': 'Channel not found'}), 404
             
         # 1. Obter apenas o novo vídeo
-        youtube = analyzer.get_youtube_service()
-        videos_response = youtube.videos().list(
+        videos_response = analyzer._execute(
+            'videos',
             id=last_video_id,
             part="snippet,statistics"
-        ).execute()
+        )
         
         if not videos_response.get('items'):
             return jsonify({'message': 'Video not found'}), 404
             
-        new_video = videos_response['items'][0]
-        video_data = {
-            'id': new_video['id'],
-            'title': new_video['snippet']['title'],
-            'views': int(new_video['statistics'].get('viewCount', 0)),
-            'likes': int(new_video['statistics'].get('likeCount', 0)),
-            'comments': int(new_video['statistics'].get('commentCount', 0)),
-            'published_at': new_video['snippet']['publishedAt'],
-            'thumbnail': new_video['snippet']['thumbnails']['high']['url'],
-            'description': new_video['snippet'].get('description', '')
-        }
-        
-        # 2. Analisar comentários apenas do novo vídeo
-        all_comments = []
-        comments = analyzer.get_all_comments(video_data['id'])
-        if comments:
-            all_comments.extend(comments)
+        video_data = video_from_item(videos_response['items'][0])
         
-        # 3. Atualizar a análise existente
-        last_analysis = Analysis.query.filter_by(
+        # 2. Localizar a análise que será atualizada
+        last_analysis = completed_analyses().filter_by(
             user_id=current_user.id,
             channel_id=channel_info['id']
         ).order_by(Analysis.analysis_date.desc()).first()
@@ -1438,61 +3656,55 @@ def analyze_new_videos(current_user):
         if not last_analysis:
             return jsonify({'message': 'No analysis found to update'}), 404
             
-        # Adicionar o novo vídeo
-        video_analysis = VideoAnalysis(
+        # 3. Analisar comentários apenas do novo vídeo (só os posteriores à marca, se o vídeo já estiver na análise)
+        all_comments = []
+        marks = load_high_water_marks(current_user.id, last_analysis.id, [video_data['id']])
+        comments = analyzer.get_all_comments(video_data['id'], marks.get(video_data['id']))
+        if comments:
+            all_comments.extend(comments)
+            
+        # Adicionar o novo vídeo (ou atualizar o que já está na análise) e os novos comentários
+        existing_video = VideoAnalysis.query.filter_by(
             analysis_id=last_analysis.id,
-            video_id=video_data['id'],
-            title=video_data['title'],
-            views=video_data['views'],
-            likes=video_data['likes'],
-            comments=video_data['comments'],
-            published_at=datetime.fromisoformat(video_data['published_at'].replace('Z', '+00:00'))
-        )
-        db.session.add(video_analysis)
-        
-        # Adicionar os novos comentários
-        for comment in all_comments:
-            comment_analysis = CommentAnalysis(
-                analysis_id=last_analysis.id,
-                video_id=comment.get('video_id', ''),
-                author=comment['author'],
-                text=comment['text'],
-                likes=comment['likes'],
-                sentiment=comment['sentiment'],
-                published_at=datetime.fromisoformat(comment['published_at'].replace('Z', '+00:00'))
-            )
-            db.session.add(comment_analysis)
+            video_id=video_data['id']
+        ).first()
+        previous_views = (existing_video.views or 0) if existing_video else 0
+        previous_likes = (existing_video.likes or 0) if existing_video else 0
+        if existing_video:
+            existing_video.title = video_data['title']
+            existing_video.views = video_data['views']
+            existing_video.likes = video_data['likes']
+            existing_video.comments = video_data['comments']
+        else:
+            bulk_insert(VideoAnalysis, video_rows(last_analysis.id, [video_data]))
+        all_comments = store_comments(last_analysis.id, all_comments)
         
-        # Atualizar métricas da análise
-        last_analysis.video_count += 1
-        last_analysis.total_views += video_data['views']
+        # Atualizar métricas da análise (views e curtidas entram pela diferença se o vídeo já era conhecido)
+        if not existing_video:
+            last_analysis.video_count += 1
+        last_analysis.total_views += video_data['views'] - previous_views
         last_analysis.total_comments += len(all_comments)
         last_analysis.positive_comments += sum(1 for c in all_comments if c['sentiment'] == 'positive')
         last_analysis.neutral_comments += sum(1 for c in all_comments if c['sentiment'] == 'neutral')
         last_analysis.negative_comments += sum(1 for c in all_comments if c['sentiment'] == 'negative')
+        rollup = db.session.get(AnalysisRollup, last_analysis.id)
+        write_analysis_rollup(
+            last_analysis, (rollup.total_likes if rollup else 0) + video_data['likes'] - previous_likes
+        )
+        save_high_water_marks(current_user.id, track_newest_comments({}, all_comments))
         
         # Atualizar cache
-        cache_entry = VideoCache(
+        VideoCache.query.filter_by(
             user_id=current_user.id,
             channel_id=channel_info['id'],
-            video_id=video_data['id'],
-            analysis_data={
-                'title': video_data['title'],
-                'views': video_data['views'],
-                'likes': video_data['likes'],
-                'comments': video_data['comments'],
-                'published_at': video_data['published_at'],
-                'thumbnail': video_data['thumbnail'],
-                'description': video_data['description']
-            }
-        )
-        db.session.add(cache_entry)
-        
+            video_id=video_data['id']
+        ).delete()
+        bulk_insert(VideoCache, video_cache_rows(current_user.id, channel_info['id'], [video_data]), commit=False)
         db.session.commit()
         
         return jsonify({
             'message': 'New video analyzed successfully',
-            'new_videos': 1,
+            'new_videos': 0 if existing_video else 1,
             'new_comments': len(all_comments)
         })
         
@@ -1505,13 +3717,14 @@ def analyze_new_videos(current_user):
     
 
 @app.route('/api/metrics', methods=['GET'])
+@cached_response
 @token_required
 def get_metrics(current_user):
     try:
         logging.info(f"Fetching metrics for user {current_user.id}")
         
-        last_analysis = Analysis.query.filter_by(user_id=current_user.id)\
-                                    .order_by(Analysis.analysis_date.desc())\
+        last_analysis = AnalysisRollup.query.filter_by(user_id=current_user.id)\
+                                    .order_by(AnalysisRollup.analysis_date.desc())\
                                     .first()
         
         if not last_analysis:
@@ -1524,11 +3737,9 @@ def get_metrics(current_user):
                 'videos': 0
             }), 200
             
-        total_likes = sum(v.likes for v in last_analysis.videos)
-        
         return jsonify({
             'views': last_analysis.total_views,
-            'likes': total_likes,
+            'likes': last_analysis.total_likes,
             'comments': last_analysis.total_comments,
             'subscribers': last_analysis.subscriber_count,
             'videos': last_analysis.video_count
@@ -1544,28 +3755,31 @@ def get_metrics(current_user):
 
 
 @app.route('/api/analytics', methods=['GET'])
+@cached_response(daily=True)
 @token_required
 def get_analytics(current_user):
     try:
         time_range = request.args.get('time_range', '30d')
         
-        # Calcular a data de início baseada no período selecionado
+        # Calcular a data de início baseada no período selecionado; o período começa à meia-noite
+        # (UTC) para que a resposta guardada valha o dia inteiro
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
         if time_range == '7d':
-            start_date = datetime.now(timezone.utc) - timedelta(days=7)
+            start_date = today - timedelta(days=7)
         elif time_range == '15d':
-            start_date = datetime.now(timezone.utc) - timedelta(days=15)
+            start_date = today - timedelta(days=15)
         elif time_range == '30d':
-            start_date = datetime.now(timezone.utc) - timedelta(days=30)
+            start_date = today - timedelta(days=30)
         else: 
             start_date = None
         
-        # Obter a última análise do usuário
-        query = Analysis.query.filter_by(user_id=current_user.id)
+        # Os totais vêm dos rollups gravados na ingestão
+        query = AnalysisRollup.query.filter_by(user_id=current_user.id)
         
         if start_date:
-            query = query.filter(Analysis.analysis_date >= start_date)
+            query = query.filter(AnalysisRollup.analysis_date >= start_date)
             
-        analyses = query.order_by(Analysis.analysis_date.desc()).all()
+        analyses = query.order_by(AnalysisRollup.analysis_date.desc()).all()
         
         if not analyses:
             return jsonify({'message': 'No analysis found'}), 404
@@ -1590,9 +3804,21 @@ def get_analytics(current_user):
             date_str = analysis.analysis_date.strftime('%d/%m')
             engagement_data['labels'].append(date_str)
             engagement_data['datasets'][0]['data'].append(analysis.total_views)
-            engagement_data['datasets'][1]['data'].append(
-                sum(v.likes for v in analysis.videos)
-            )
+            engagement_data['datasets'][1]['data'].append(analysis.total_likes)
+        
+        # Situação diária do canal
+        daily_query = ChannelDailyRollup.query.filter_by(user_id=current_user.id)
+        if start_date:
+            daily_query = daily_query.filter(ChannelDailyRollup.day >= start_date.date())
+        daily_data = [{
+            'date': daily.day.isoformat(),
+            'channel_id': daily.channel_id,
+            'analyses': daily.analysis_count,
+            'views': daily.total_views,
+            'likes': daily.total_likes,
+            'comments': daily.total_comments,
+            'subscribers': daily.subscriber_count
+        } for daily in daily_query.order_by(ChannelDailyRollup.day.asc())]
         
         # Dados de sentimento (somar todas as análises)
         positive = sum(a.positive_comments for a in analyses)
@@ -1637,8 +3863,8 @@ def get_analytics(current_user):
         }
         
         # Top vídeos (última análise)
-        last_analysis = analyses[0]
-        top_videos = VideoAnalysis.query.filter_by(analysis_id=last_analysis.id)\
+        last_analysis_id = analyses[0].analysis_id
+        top_videos = VideoAnalysis.query.filter_by(analysis_id=last_analysis_id)\
                                      .order_by(VideoAnalysis.views.desc())\
                                      .limit(5)\
                                      .all()
@@ -1653,7 +3879,7 @@ def get_analytics(current_user):
         } for v in top_videos]
         
         # Top comentários (última análise)
-        top_comments = CommentAnalysis.query.filter_by(analysis_id=last_analysis.id)\
+        top_comments = analysis_comments_query(last_analysis_id)\
                                          .order_by(CommentAnalysis.likes.desc())\
                                          .limit(5)\
                                          .all()
@@ -1670,6 +3896,7 @@ def get_analytics(current_user):
             'engagement': engagement_data,
             'sentiment': sentiment_data,
             'performance': performance_data,
+            'daily': daily_data,
             'top_videos': top_videos_data,
             'top_comments': top_comments_data
         }), 200
@@ -1679,6 +3906,7 @@ def get_analytics(current_user):
         return jsonify({'message': 'Error getting analytics'}), 500
 
 @app.route('/api/videos/<video_id>/analytics', methods=['GET'])
+@cached_response
 @token_required
 def get_video_analytics(current_user, video_id):
     try:
@@ -1688,7 +3916,8 @@ def get_video_analytics(current_user, video_id):
         video = VideoAnalysis.query.join(Analysis)\
                                  .filter(
                                      VideoAnalysis.video_id == video_id,
-                                     Analysis.user_id == current_user.id
+                                     Analysis.user_id == current_user.id,
+                                     Analysis.status == 'completed'
                                  )\
                                  .first()
 
@@ -1696,10 +3925,9 @@ def get_video_analytics(current_user, video_id):
             return jsonify({'success': False, 'message': 'Video not found'}), 404
 
         # Obter todos os comentários do vídeo
-        comments = CommentAnalysis.query.filter_by(
-            analysis_id=video.analysis_id,
-            video_id=video_id
-        ).all()
+        comments = analysis_comments_query(video.analysis_id)\
+                                          .filter(CommentAnalysis.video_id == video_id)\
+                                          .all()
 
         # Calcular estatísticas de sentimento
         sentiment_counts = {
@@ -1715,7 +3943,8 @@ def get_video_analytics(current_user, video_id):
         video_analyses = VideoAnalysis.query.join(Analysis)\
                                           .filter(
                                               VideoAnalysis.video_id == video_id,
-                                              Analysis.user_id == current_user.id
+                                              Analysis.user_id == current_user.id,
+                                              Analysis.status == 'completed'
                                           )\
                                           .order_by(Analysis.analysis_date.asc())\
                                           .all()
@@ -1765,14 +3994,170 @@ def get_video_analytics(current_user, video_id):
         return jsonify({'success': False, 'message': 'Error fetching analytics'}), 500
     
 
+# Exportação
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_TOP_COMMENTS = 100
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+def format_export_date(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+class AnalysisExporter:
+    """Gera as linhas da exportação sob demanda, em lotes, sem carregar a análise inteira na memória"""
+
+    VIDEO_HEADER = ["Título", "Visualizações", "Curtidas", "Comentários", "Data de Publicação", "Taxa de Curtidas (%)", "Taxa de Comentários (%)"]
+    COMMENT_HEADER = ["Vídeo", "Autor", "Comentário", "Curtidas", "Sentimento", "Data"]
+
+    def __init__(self, analysis, all_comments=False, batch_size=None):
+        self.analysis = analysis
+        self.all_comments = all_comments
+        self.batch_size = batch_size or EXPORT_BATCH_SIZE
+        # Título de cada vídeo montado uma única vez
+        self.titles = dict(
+            db.session.query(VideoAnalysis.video_id, VideoAnalysis.title)
+            .filter(VideoAnalysis.analysis_id == analysis.id)
+        )
+
+    def total_likes(self):
+        rollup = db.session.get(AnalysisRollup, self.analysis.id)
+        if rollup:
+            return rollup.total_likes
+        return db.session.query(func.coalesce(func.sum(VideoAnalysis.likes), 0))\
+            .filter(VideoAnalysis.analysis_id == self.analysis.id)\
+            .scalar()
+
+    def summary_rows(self):
+        analysis = self.analysis
+        channel_data = [
+            ["Inscritos", analysis.subscriber_count],
+            ["Vídeos", analysis.video_count],
+            ["Visualizações", analysis.total_views],
+            ["Curtidas", self.total_likes()],
+            ["Comentários", analysis.total_comments]
+        ]
+        for name, value in channel_data:
+            yield [
+                name, value,
+                analysis.positive_comments,
+                analysis.neutral_comments,
+                analysis.negative_comments,
+                analysis.total_comments
+            ]
+
+    def video_rows(self):
+        videos = db.session.query(
+            VideoAnalysis.title, VideoAnalysis.views, VideoAnalysis.likes,
+            VideoAnalysis.comments, VideoAnalysis.published_at
+        ).filter(VideoAnalysis.analysis_id == self.analysis.id)\
+            .order_by(VideoAnalysis.published_at.desc())\
+            .execution_options(yield_per=self.batch_size)
+        for title, views, likes, comments, published_at in videos:
+            views = views or 0
+            like_rate = ((likes or 0) / views * 100) if views > 0 else 0
+            comment_rate = ((comments or 0) / views * 100) if views > 0 else 0
+            yield [
+                title, views, likes, comments,
+                format_export_date(published_at),
+                f"{like_rate:.2f}",
+                f"{comment_rate:.2f}"
+            ]
+
+    def comment_records(self):
+        """(título do vídeo, autor, texto, curtidas, sentimento, data) de cada comentário exportado"""
+        query = analysis_comments_query(self.analysis.id).with_entities(
+            CommentAnalysis.video_id, CommentAnalysis.author, CommentAnalysis.text,
+            CommentAnalysis.likes, CommentAnalysis.sentiment, CommentAnalysis.published_at
+        )
+        if self.all_comments:
+            query = query.order_by(CommentAnalysis.id).execution_options(yield_per=self.batch_size)
+        else:
+            query = query.order_by(CommentAnalysis.likes.desc()).limit(EXPORT_TOP_COMMENTS)
+        for video_id, author, text_, likes, sentiment, published_at in query:
+            yield self.titles.get(video_id, "Desconhecido"), author, text_, likes, sentiment, published_at
+
+    def comment_rows(self):
+        for title, author, text_, likes, sentiment, published_at in self.comment_records():
+            yield [title, author, text_, likes, (sentiment or '').capitalize(), format_export_date(published_at)]
+
+    def sections(self):
+        comments_title = "Comentários" if self.all_comments else "Comentários mais relevantes"
+        return [
+            ("Resumo do Canal", ["Métrica", "Valor", "Positivos", "Neutros", "Negativos", "Total Comentários"], self.summary_rows()),
+            ("Vídeos", self.VIDEO_HEADER, self.video_rows()),
+            (comments_title, self.COMMENT_HEADER, self.comment_rows())
+        ]
+
+    def iter_csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for index, (title, header, rows) in enumerate(self.sections()):
+            if index:
+                writer.writerow([])
+            writer.writerow([title])
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                    yield buffer.getvalue().encode('utf-8')
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    def write_xlsx(self, fileobj):
+        # write_only grava as linhas em disco à medida que são adicionadas
+        workbook = Workbook(write_only=True)
+        for title, header, rows in self.sections():
+            sheet = workbook.create_sheet(title[:31])
+            sheet.append(header)
+            for row in rows:
+                sheet.append(row)
+        workbook.save(fileobj)
+
+    def write_parquet(self, fileobj):
+        schema = pa.schema([
+            ('video_title', pa.string()),
+            ('author', pa.string()),
+            ('text', pa.string()),
+            ('likes', pa.int64()),
+            ('sentiment', pa.string()),
+            ('published_at', pa.timestamp('us'))
+        ])
+        with pq.ParquetWriter(fileobj, schema) as writer:
+            for batch in iter_batches(self.comment_records(), self.batch_size):
+                writer.write_table(pa.Table.from_pylist(
+                    [dict(zip(schema.names, record)) for record in batch], schema=schema
+                ))
+
+def iter_file(fileobj, chunk_size=EXPORT_CHUNK_SIZE):
+    try:
+        fileobj.seek(0)
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
 @app.route('/api/export-analysis/<int:analysis_id>', methods=['GET'])
 @token_required
 def export_analysis(current_user, analysis_id):
     try:
-        logging.info(f"Exporting analysis {analysis_id} for user {current_user.id}")
+        export_format = request.args.get('format', 'csv').lower()
+        logging.info(f"Exporting analysis {analysis_id} for user {current_user.id} as {export_format}")
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'message': f'Unsupported export format: {export_format}'}), 400
+        if export_format == 'parquet' and pa is None:
+            return jsonify({'message': 'Parquet export requires pyarrow'}), 501
         
         # Verificar se a análise pertence ao usuário
-        analysis = Analysis.query.filter_by(
+        analysis = completed_analyses().filter_by(
             id=analysis_id,
             user_id=current_user.id
         ).first()
@@ -1780,109 +4165,205 @@ def export_analysis(current_user, analysis_id):
         if not analysis:
             return jsonify({'message': 'Analysis not found or not authorized'}), 404
         
-        # Criar um buffer para o CSV
-        buffer = BytesIO()
-        
-        # Criar um escritor CSV
-        writer = csv.writer(buffer)
-        
-        # Escrever cabeçalhos do resumo do canal
-        writer.writerow(["Resumo do Canal"])
-        writer.writerow(["Métrica", "Valor", "Positivos", "Neutros", "Negativos", "Total Comentários"])
+        # Parquet é pensado para despejos completos; CSV/XLSX exportam os comentários mais curtidos por padrão
+        default_comments = 'all' if export_format == 'parquet' else 'top'
+        all_comments = request.args.get('comments', default_comments) == 'all'
+        exporter = AnalysisExporter(analysis, all_comments=all_comments)
         
-        # Adicionar dados do canal
-        channel_data = [
-            ["Inscritos", analysis.subscriber_count],
-            ["Vídeos", analysis.video_count],
-            ["Visualizações", analysis.total_views],
-            ["Curtidas", sum(v.likes for v in analysis.videos)],
-            ["Comentários", analysis.total_comments]
-        ]
+        if export_format == 'csv':
+            body = exporter.iter_csv()
+        else:
+            # XLSX e Parquet só ficam válidos ao fim da escrita: gera num arquivo temporário e transmite em blocos
+            fileobj = tempfile.TemporaryFile()
+            try:
+                if export_format == 'xlsx':
+                    exporter.write_xlsx(fileobj)
+                else:
+                    exporter.write_parquet(fileobj)
+            except Exception:
+                fileobj.close()
+                raise
+            body = iter_file(fileobj)
         
-        for row in channel_data:
-            writer.writerow([
-                row[0], row[1],
-                analysis.positive_comments,
-                analysis.neutral_comments,
-                analysis.negative_comments,
-                analysis.total_comments
-            ])
-        
-        # Adicionar linha em branco
-        writer.writerow([])
-        writer.writerow(["Vídeos"])
-        writer.writerow(["Título", "Visualizações", "Curtidas", "Comentários", "Data de Publicação", "Taxa de Curtidas (%)", "Taxa de Comentários (%)"])
-        
-        # Adicionar dados dos vídeos
-        for video in analysis.videos:
-            like_rate = (video.likes / video.views * 100) if video.views > 0 else 0
-            comment_rate = (video.comments / video.views * 100) if video.views > 0 else 0
-            
-            writer.writerow([
-                video.title,
-                video.views,
-                video.likes,
-                video.comments,
-                video.published_at.strftime('%Y-%m-%d %H:%M') if video.published_at else '',
-                f"{like_rate:.2f}",
-                f"{comment_rate:.2f}"
-            ])
-        
-        # Adicionar linha em branco
-        writer.writerow([])
-        writer.writerow(["Comentários mais relevantes"])
-        writer.writerow(["Vídeo", "Autor", "Comentário", "Curtidas", "Sentimento", "Data"])
-        
-        # Adicionar comentários mais relevantes
-        top_comments = sorted(
-            analysis.comments, 
-            key=lambda c: c.likes, 
-            reverse=True
-        )[:100]  # Limitar a 100 comentários
-        
-        for comment in top_comments:
-            video_title = next(
-                (v.title for v in analysis.videos if v.video_id == comment.video_id),
-                "Desconhecido"
-            )
-            
-            writer.writerow([
-                video_title,
-                comment.author,
-                comment.text,
-                comment.likes,
-                comment.sentiment.capitalize(),
-                comment.published_at.strftime('%Y-%m-%d %H:%M') if comment.published_at else ''
-            ])
-        
-        buffer.seek(0)
-        
-        # Nome do arquivo
-        filename = f"analise_{analysis.channel_name}_{analysis.analysis_date.strftime('%Y%m%d')}.csv"
-        
-        # Enviar o arquivo como resposta
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='text/csv'
-        )
+        filename = f"analise_{analysis.channel_name}_{analysis.analysis_date.strftime('%Y%m%d')}.{export_format}"
+        response = app.response_class(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format])
+        try:
+            filename.encode('ascii')
+            disposition = {'filename': filename}
+        except UnicodeEncodeError:
+            disposition = {
+                'filename': unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii'),
+                'filename*': f"UTF-8''{quote(filename)}"
+            }
+        response.headers.set('Content-Disposition', 'attachment', **disposition)
+        return response
         
     except Exception as e:
         logging.error(f"Error exporting analysis: {str(e)}", exc_info=True)
         return jsonify({'message': 'Failed to export analysis', 'error': str(e)}), 500
     
     
+# Migrações: db.create_all() cria tabelas novas, mas não altera as existentes
+def migrate_comment_store(conn):
+    """Adiciona o ID do YouTube aos comentários e liga os comentários antigos às suas análises"""
+    columns = {column['name'] for column in inspect(conn).get_columns('comment_analysis')}
+    if 'youtube_comment_id' in columns:
+        return
+    conn.execute(text('ALTER TABLE comment_analysis ADD COLUMN youtube_comment_id VARCHAR(100)'))
+    conn.execute(text('CREATE UNIQUE INDEX ix_comment_analysis_youtube_comment_id ON comment_analysis (youtube_comment_id)'))
+    conn.execute(text('INSERT INTO analysis_comments (analysis_id, comment_id) SELECT analysis_id, id FROM comment_analysis'))
+    logging.info("Migrated comment_analysis to the deduplicated comment store")
+
+def migrate_analysis_status(conn):
+    """Adiciona o status às análises; as análises existentes são consideradas concluídas"""
+    columns = {column['name'] for column in inspect(conn).get_columns('analysis')}
+    if 'status' in columns:
+        return
+    conn.execute(text("ALTER TABLE analysis ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'completed'"))
+    logging.info("Added status column to analysis")
+
+def migrate_analytics_rollups(conn):
+    """Preenche os rollups das análises concluídas antes da existência das tabelas"""
+    analysis = Analysis.__table__
+    video = VideoAnalysis.__table__
+    rollup = AnalysisRollup.__table__
+    likes = select(video.c.analysis_id, func.coalesce(func.sum(video.c.likes), 0).label('total_likes'))\
+        .group_by(video.c.analysis_id)\
+        .subquery()
+    missing = select(
+        analysis.c.id, analysis.c.user_id, analysis.c.channel_id, analysis.c.analysis_date,
+        analysis.c.subscriber_count, analysis.c.video_count, analysis.c.total_views, likes.c.total_likes,
+        analysis.c.total_comments, analysis.c.positive_comments, analysis.c.neutral_comments, analysis.c.negative_comments
+    ).select_from(analysis.outerjoin(likes, likes.c.analysis_id == analysis.c.id))\
+        .where(analysis.c.status == 'completed')\
+        .where(~select(rollup.c.analysis_id).where(rollup.c.analysis_id == analysis.c.id).exists())
+    rows = [{
+        'analysis_id': row.id,
+        'user_id': row.user_id,
+        'channel_id': row.channel_id,
+        'analysis_date': row.analysis_date or datetime.utcnow(),
+        **{metric: getattr(row, metric) or 0 for metric in ROLLUP_METRICS}
+    } for row in conn.execute(missing)]
+    if not rows:
+        return
+    for chunk in iter_batches(rows, BULK_INSERT_BATCH_SIZE):
+        conn.execute(insert(rollup), chunk)
+        
+    # Recalcula os dias afetados a partir dos rollups das análises
+    daily = ChannelDailyRollup.__table__
+    days = {(row['user_id'], row['channel_id'], row['analysis_date'].date()) for row in rows}
+    latest = {}
+    for row in conn.execute(select(rollup).order_by(rollup.c.analysis_date.asc())):
+        key = (row.user_id, row.channel_id, row.analysis_date.date())
+        if key in days:
+            count = latest[key]['analysis_count'] + 1 if key in latest else 1
+            latest[key] = {
+                'user_id': row.user_id,
+                'channel_id': row.channel_id,
+                'day': key[2],
+                'analysis_count': count,
+                **{metric: getattr(row, metric) for metric in ROLLUP_METRICS}
+            }
+    for user_id, channel_id, day in days:
+        conn.execute(daily.delete().where(and_(
+            daily.c.user_id == user_id, daily.c.channel_id == channel_id, daily.c.day == day
+        )))
+    conn.execute(insert(daily), list(latest.values()))
+    logging.info(f"Backfilled analytics rollups for {len(rows)} analyses")
+
+def existing_index_names(conn):
+    """Nomes dos índices do banco, incluindo os de expressão (que o inspector não reflete)"""
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+    elif conn.dialect.name == 'mysql':
+        rows = conn.execute(text("SELECT DISTINCT index_name FROM information_schema.statistics WHERE table_schema = DATABASE()"))
+    else:
+        inspector = inspect(conn)
+        return {index['name'] for table in db.metadata.sorted_tables for index in inspector.get_indexes(table.name)}
+    return {row[0] for row in rows}
+
+# Índices que saíram dos modelos. ix_comment_analysis_likes era global: os top comentários são
+# filtrados pela análise via analysis_comments e ordenar por likes continua exigindo um sort
+DROPPED_INDEXES = {'ix_comment_analysis_likes': 'comment_analysis'}
+
+def migrate_indexes(conn):
+    """Cria os índices declarados nos modelos que ainda não existem no banco e remove os que saíram.
+
+    Roda numa conexão em autocommit, sem savepoints: no MySQL cada DDL faz commit implícito e
+    derrubaria o savepoint. Cada índice falha sozinho (o índice único de email falha se já houver
+    emails repetidos com outra caixa).
+    """
+    existing = existing_index_names(conn)
+    for name, table in DROPPED_INDEXES.items():
+        if name not in existing:
+            continue
+        if conn.dialect.name == 'mysql':
+            conn.execute(text(f'DROP INDEX {name} ON {table}'))
+        else:
+            conn.execute(text(f'DROP INDEX {name}'))
+        logging.info(f"Index {name} dropped")
+        
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                index.create(conn)
+                logging.info(f"Index {index.name} created")
+            except exc.DBAPIError as e:
+                logging.warning(f"Could not create index {index.name}: {str(e)}")
+
+def migrate_analysis_job_mode(conn):
+    """Adiciona o modo (incremental/refresh) aos jobs de análise"""
+    columns = {column['name'] for column in inspect(conn).get_columns('analysis_job')}
+    if 'mode' in columns:
+        return
+    conn.execute(text("ALTER TABLE analysis_job ADD COLUMN mode VARCHAR(20) NOT NULL DEFAULT 'incremental'"))
+    logging.info("Added mode column to analysis_job")
+
+def migrate_analysis_job_batch(conn):
+    """Liga os jobs de análise ao lote (analysis_batch) que os criou"""
+    columns = {column['name'] for column in inspect(conn).get_columns('analysis_job')}
+    if 'batch_id' in columns:
+        return
+    conn.execute(text("ALTER TABLE analysis_job ADD COLUMN batch_id INTEGER REFERENCES analysis_batch (id)"))
+    logging.info("Added batch_id column to analysis_job")
+
+def migrate_tracked_channel_refresh(conn):
+    """Adiciona aos canais acompanhados o estado usado pelo agendador de atualizações"""
+    columns = {column['name'] for column in inspect(conn).get_columns('tracked_channel')}
+    if 'video_count' not in columns:
+        conn.execute(text("ALTER TABLE tracked_channel ADD COLUMN video_count INTEGER"))
+        logging.info("Added video_count column to tracked_channel")
+    if 'last_checked_at' not in columns:
+        conn.execute(text("ALTER TABLE tracked_channel ADD COLUMN last_checked_at DATETIME"))
+        logging.info("Added last_checked_at column to tracked_channel")
+
+MIGRATIONS = [
+    migrate_comment_store,
+    migrate_analysis_status,
+    migrate_analysis_job_mode,
+    migrate_analysis_job_batch,
+    migrate_tracked_channel_refresh,
+    migrate_analytics_rollups
+]
+
+def run_migrations():
+    with db.engine.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        migrate_indexes(conn)
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-        try:
-            db.engine.execute('''
-                CREATE UNIQUE INDEX idx_email_lower 
-                ON user (LOWER(email))
-            ''')
-            logging.info("Case-insensitive index created")
-        except Exception as e:
-            logging.warning(f"Index already exists: {str(e)}")
+        run_migrations()
+        
+        # Com o reloader do modo debug, apenas o processo filho atende requisições
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            init_youtube_analyzer(app)
+            recover_analysis_jobs()
+            channel_refresh_scheduler.start()
     
     app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Mede a latência de /api/all-videos conforme o número de vídeos: contagem por vídeo (N+1) vs consulta agrupada.
+
+Uso (a partir de server/):
+    python benchmarks/bench_all_videos.py --videos 100 500 2000 --comments-per-video 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_all_videos.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+
+import jwt  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import (  # noqa: E402
+    Analysis, CommentAnalysis, User, VideoAnalysis, app, bulk_insert, db, store_comments
+)
+
+def synthetic_videos(count):
+    for i in range(count):
+        yield {
+            'analysis_id': None,
+            'video_id': f'video-{i}',
+            'title': f'video {i}',
+            'views': i * 10,
+            'likes': i,
+            'comments': i,
+        }
+
+def synthetic_comments(videos, per_video):
+    for v in range(videos):
+        for i in range(per_video):
+            yield {
+                'id': f'comment-{v}-{i}',
+                'video_id': f'video-{v}',
+                'author': 'bench',
+                'text': f'synthetic comment {v}-{i}',
+                'likes': 0,
+                'sentiment': 'neutral',
+                'published_at': '2024-01-01T12:00:00Z'
+            }
+
+def seed(videos, per_video):
+    db.drop_all()
+    db.create_all()
+    user = User(name='bench', email='bench@example.com', password='-', analysis_count=0)
+    db.session.add(user)
+    db.session.commit()
+    analysis = Analysis(user_id=user.id, channel_id='bench', channel_name='bench')
+    db.session.add(analysis)
+    db.session.commit()
+    bulk_insert(VideoAnalysis, ({**row, 'analysis_id': analysis.id} for row in synthetic_videos(videos)))
+    store_comments(analysis.id, list(synthetic_comments(videos, per_video)))
+    return user.id, analysis.id
+
+def per_video_counts(analysis_id):
+    videos = VideoAnalysis.query.filter_by(analysis_id=analysis_id).all()
+    return {video.video_id: CommentAnalysis.query.filter_by(video_id=video.video_id).count() for video in videos}
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--comments-per-video', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'videos':>8} {'N+1 (ms)':>12} {'endpoint (ms)':>14} {'queries':>8} {'speedup':>8}")
+    with app.app_context():
+        counter = StatementCounter()
+        event.listen(db.engine, 'before_cursor_execute', counter)
+        client = app.test_client()
+        for videos in args.videos:
+            user_id, analysis_id = seed(videos, args.comments_per_video)
+            headers = {'x-access-token': jwt.encode({'user_id': user_id}, app.config['SECRET_KEY'])}
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                per_video_counts(analysis_id)
+                db.session.remove()
+            naive = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                counter.count = 0
+                response = client.get('/api/all-videos', headers=headers)
+                assert response.status_code == 200, response.data
+            grouped = (time.perf_counter() - start) / args.repeat
+
+            print(f"{videos:>8} {naive * 1000:>12.1f} {grouped * 1000:>14.1f} {counter.count:>8} {naive / grouped:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
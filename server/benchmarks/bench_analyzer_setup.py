@@ -0,0 +1,61 @@
+"""Mede o custo de preparar o analisador a cada requisição vs reutilizar o analisador compartilhado da aplicação.
+
+Uso (a partir de server/):
+    python benchmarks/bench_analyzer_setup.py --requests 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_analyzer_setup.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+# Nenhuma chamada sai para a API; a chave só precisa existir para montar o cliente
+os.environ.setdefault('YOUTUBE_API_KEY_1', 'bench-key-0000000000')
+
+import googleapiclient.discovery  # noqa: E402
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer  # noqa: E402
+
+from app import (  # noqa: E402
+    API_SERVICE_NAME, API_VERSION, app, get_youtube_analyzer, init_youtube_analyzer, youtube_key_pool
+)
+
+def per_request_setup(key):
+    """O que cada requisição fazia antes: léxico do VADER + build() do cliente com o discovery em JSON"""
+    SentimentIntensityAnalyzer()
+    googleapiclient.discovery.build(API_SERVICE_NAME, API_VERSION, developerKey=key, cache_discovery=False)
+
+def shared_setup(key):
+    analyzer = get_youtube_analyzer()
+    with analyzer.key_pool.service(key):
+        pass
+
+def timed(fn, key, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn(key)
+    return (time.perf_counter() - start) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    key = youtube_key_pool.keys[0]
+    with app.app_context():
+        start = time.perf_counter()
+        init_youtube_analyzer(app)
+        startup = time.perf_counter() - start
+
+        naive = timed(per_request_setup, key, args.requests)
+        shared = timed(shared_setup, key, args.requests)
+
+    print(f"startup (one-off): {startup * 1000:8.2f} ms")
+    print(f"per request, old:  {naive * 1000:8.2f} ms")
+    print(f"per request, new:  {shared * 1000:8.3f} ms ({naive / shared:.0f}x)")
+
+if __name__ == '__main__':
+    main()
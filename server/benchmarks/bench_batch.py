@@ -0,0 +1,92 @@
+"""Mede /api/analyze-channels com vários canais da API falsa: tempo do lote vs um canal sozinho e vs o limite do rate limiter.
+
+Roda o lote duas vezes: na segunda os channel_ids já resolvidos dispensam o search.list.
+
+Uso (a partir de server/):
+    python benchmarks/bench_batch.py --channels 50 --videos 20 --comments-per-video 50 --latency 0.1 --rps 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_batch.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+for i in range(1, 4):
+    os.environ.setdefault(f'YOUTUBE_API_KEY_{i}', f'bench-key-{i}-0000000000')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--videos', type=int, default=20)
+    parser.add_argument('--comments-per-video', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.1, help='segundos simulados por chamada à API')
+    parser.add_argument('--rps', type=float, default=50, help='limite de requisições por segundo à API')
+    return parser.parse_args()
+
+args = parse_args()
+os.environ.setdefault('YOUTUBE_REQUESTS_PER_SECOND', str(args.rps))
+os.environ.setdefault('YOUTUBE_REQUEST_BURST', str(max(10, int(args.rps))))
+
+import jwt  # noqa: E402
+
+import app as backend  # noqa: E402
+from fake_youtube import FakeYouTubeNetwork  # noqa: E402
+
+def wait_for(client, url, headers):
+    while True:
+        body = client.get(url, headers=headers).json
+        if body['status'] in ('completed', 'failed'):
+            return body
+        time.sleep(0.1)
+
+def timed_batch(client, headers, network, channels):
+    network.reset_stats()
+    start = time.perf_counter()
+    response = client.post('/api/analyze-channels', json={'channels': channels}, headers=headers)
+    assert response.status_code == 202, response.data
+    batch = wait_for(client, response.json['status_url'], headers)
+    return time.perf_counter() - start, batch, network.stats()
+
+def main():
+    network = FakeYouTubeNetwork.synthetic(
+        args.channels, videos=args.videos, comments_per_video=args.comments_per_video, latency=args.latency
+    )
+    backend.youtube_key_pool = backend.APIKeyPool(
+        backend.DEVELOPER_KEYS, daily_quota=10 ** 9, service_factory=network.service_factory
+    )
+    if backend.YOUTUBE_FETCH_ENGINE == 'async' and backend.httpx is not None:
+        backend.youtube_async_engine = backend.AsyncFetchEngine(transport=network.transport())
+    channels = [channel.channel_title for channel in network.channels]
+
+    app, db = backend.app, backend.db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        backend.run_migrations()
+        users = []
+        for name in ('single', 'batch'):
+            user = backend.User(name=name, email=f'{name}@example.com', password='-', analysis_count=0)
+            db.session.add(user)
+            db.session.commit()
+            users.append({'x-access-token': jwt.encode({'user_id': user.id}, app.config['SECRET_KEY'])})
+    single_headers, batch_headers = users
+    client = app.test_client()
+
+    # Referência: um canal sozinho (outro usuário, para não reaproveitar nada do lote)
+    single, _, _ = timed_batch(client, single_headers, network, channels[:1])
+
+    print(f"{'run':>12} {'channels':>9} {'wall (s)':>9} {'serial est.':>12} {'rate bound':>11} "
+          f"{'API calls':>10} {'search':>7} {'quota':>7} {'failed':>7}")
+    for run in ('first', 'repeat'):
+        wall, batch, api = timed_batch(client, batch_headers, network, channels)
+        rate_bound = api['total_calls'] / args.rps
+        print(f"{run:>12} {len(channels):>9} {wall:>9.2f} {single * len(channels):>12.2f} {rate_bound:>11.2f} "
+              f"{api['total_calls']:>10} {api['calls'].get('search.list', 0):>7} {api['quota_units']:>7} "
+              f"{batch['jobs_by_status']['failed']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Mede o custo em quota do agendador de atualizações dos canais acompanhados (ChannelRefreshScheduler).
+
+Analisa os canais uma vez por lote e roda rodadas do agendador: sem vídeos novos, com vídeos
+novos em parte dos canais e logo depois da análise incremental. Compara com o
+/api/check-channel-updates chamado canal a canal.
+
+Uso (a partir de server/):
+    python benchmarks/bench_channel_refresh.py --channels 120 --updated 10 --new-videos 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_channel_refresh.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+os.environ.setdefault('YOUTUBE_REQUESTS_PER_SECOND', '1000')
+os.environ.setdefault('YOUTUBE_REQUEST_BURST', '1000')
+for i in range(1, 4):
+    os.environ.setdefault(f'YOUTUBE_API_KEY_{i}', f'bench-key-{i}-0000000000')
+
+import jwt  # noqa: E402
+
+import app as backend  # noqa: E402
+from fake_youtube import FakeYouTubeNetwork  # noqa: E402
+
+def wait_for(client, url, headers):
+    while True:
+        body = client.get(url, headers=headers).json
+        if body['status'] in ('completed', 'failed'):
+            return body
+        time.sleep(0.05)
+
+def wait_for_jobs(job_ids):
+    while True:
+        with backend.app.app_context():
+            jobs = backend.AnalysisJob.query.filter(backend.AnalysisJob.id.in_(job_ids)).all()
+            statuses = [job.status for job in jobs]
+            backend.db.session.remove()
+        if all(status in ('completed', 'failed') for status in statuses):
+            return statuses
+        time.sleep(0.05)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--channels', type=int, default=120)
+    parser.add_argument('--videos', type=int, default=20)
+    parser.add_argument('--comments-per-video', type=int, default=20)
+    parser.add_argument('--updated', type=int, default=10, help='canais que publicam vídeos novos')
+    parser.add_argument('--new-videos', type=int, default=3, help='vídeos novos por canal atualizado')
+    args = parser.parse_args()
+
+    network = FakeYouTubeNetwork.synthetic(
+        args.channels, videos=args.videos, comments_per_video=args.comments_per_video
+    )
+    backend.youtube_key_pool = backend.APIKeyPool(
+        backend.DEVELOPER_KEYS, daily_quota=10 ** 9, service_factory=network.service_factory
+    )
+    channels = [channel.channel_title for channel in network.channels]
+
+    app, db = backend.app, backend.db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        backend.run_migrations()
+        user = backend.User(name='bench', email='bench@example.com', password='-', analysis_count=0)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        headers = {'x-access-token': jwt.encode({'user_id': user_id}, app.config['SECRET_KEY'])}
+    client = app.test_client()
+
+    for first in range(0, len(channels), backend.MAX_BATCH_CHANNELS):
+        batch_channels = channels[first:first + backend.MAX_BATCH_CHANNELS]
+        response = client.post('/api/analyze-channels', json={'channels': batch_channels}, headers=headers)
+        assert response.status_code == 202, response.data
+        batch = wait_for(client, response.json['status_url'], headers)
+        assert batch['jobs_by_status']['failed'] == 0, batch
+
+    scheduler = backend.ChannelRefreshScheduler(interval=0)
+    print(f"{'round':>18} {'channels':>9} {'API calls':>10} {'quota':>7} {'queued':>7} {'wall (s)':>9}")
+
+    def scheduler_round(name):
+        network.reset_stats()
+        start = time.perf_counter()
+        summary = scheduler.run_once()
+        wall = time.perf_counter() - start
+        api = network.stats()
+        print(f"{name:>18} {summary['checked']:>9} {api['total_calls']:>10} {api['quota_units']:>7} "
+              f"{len(summary['jobs']):>7} {wall:>9.3f}")
+        return summary
+
+    scheduler_round('no new videos')
+
+    for channel in network.channels[:args.updated]:
+        channel.add_videos(args.new_videos, args.comments_per_video)
+    summary = scheduler_round('new videos')
+
+    start = time.perf_counter()
+    statuses = wait_for_jobs(summary['jobs'])
+    print(f"incremental analyses: {statuses.count('completed')}/{len(statuses)} completed "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    scheduler_round('after analyses')
+
+    with app.app_context():
+        analyses = backend.completed_analyses().filter_by(user_id=user_id).all()
+        latest = {}
+        for analysis in analyses:
+            if analysis.channel_id not in latest or analysis.id > latest[analysis.channel_id].id:
+                latest[analysis.channel_id] = analysis
+        fresh = sum(
+            latest[channel.channel_id].video_count == channel.video_count for channel in network.channels
+        )
+        db.session.remove()
+    print(f"channels with an up-to-date analysis: {fresh}/{len(network.channels)}")
+
+    # Referência: o frontend verificando canal a canal
+    network.reset_stats()
+    for name in channels:
+        response = client.post('/api/check-channel-updates', json={'channel_name': name}, headers=headers)
+        assert response.status_code == 200, response.data
+    api = network.stats()
+    print(f"{'check per channel':>18} {len(channels):>9} {api['total_calls']:>10} {api['quota_units']:>7}")
+
+if __name__ == '__main__':
+    main()
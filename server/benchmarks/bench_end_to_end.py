@@ -0,0 +1,139 @@
+"""Benchmark ponta a ponta de /api/analyze-channel-complete contra a API falsa (fake_youtube), sem chaves reais.
+
+Cada perfil roda em um processo próprio (banco SQLite novo, pico de RSS isolado) e reporta
+tempo total, chamadas à API, unidades de quota, linhas gravadas por segundo e pico de RSS.
+
+Uso (a partir de server/):
+    python benchmarks/bench_end_to_end.py                      # small e medium
+    python benchmarks/bench_end_to_end.py --profiles mega --latency 0.05
+    python benchmarks/bench_end_to_end.py --engine threads async --latency 0.05   # requer httpx
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+# (vídeos, comentários por vídeo)
+PROFILES = {
+    'small': (10, 50),
+    'medium': (200, 200),
+    'mega': (2000, 500),
+}
+ROW_TABLES = ('video_analysis', 'comment_analysis', 'analysis_comments', 'video_cache')
+
+def run_profile(args):
+    """Executado no processo filho: sobe a aplicação com a API falsa e roda uma análise completa"""
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_end_to_end.db')}")
+    os.environ.setdefault('YOUTUBE_REQUESTS_PER_SECOND', str(args.rps))
+    os.environ.setdefault('YOUTUBE_REQUEST_BURST', str(max(10, int(args.rps))))
+    os.environ['YOUTUBE_FETCH_ENGINE'] = args.engine[0]
+    for i in range(1, 4):
+        os.environ.setdefault(f'YOUTUBE_API_KEY_{i}', f'bench-key-{i}-0000000000')
+
+    import jwt
+    from sqlalchemy import text
+
+    import app as backend
+    from fake_youtube import FakeYouTube
+
+    videos, comments_per_video = PROFILES[args.run_profile]
+    fake = FakeYouTube(videos=videos, comments_per_video=comments_per_video,
+                       latency=args.latency, quota_error_rate=args.quota_error_rate)
+    # A quota é medida pela API falsa; o pool não deve interromper a análise
+    backend.youtube_key_pool = backend.APIKeyPool(
+        backend.DEVELOPER_KEYS, daily_quota=10 ** 9, service_factory=fake.service_factory
+    )
+    if args.engine[0] == 'async':
+        backend.youtube_async_engine = backend.AsyncFetchEngine(transport=fake.transport())
+
+    app, db = backend.app, backend.db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        backend.run_migrations()
+        user = backend.User(name='bench', email='bench@example.com', password='-',
+                            youtube_channel=fake.channel_title, analysis_count=0)
+        db.session.add(user)
+        db.session.commit()
+        headers = {'x-access-token': jwt.encode({'user_id': user.id}, app.config['SECRET_KEY'])}
+
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post('/api/analyze-channel-complete', json={'channel_name': fake.channel_title}, headers=headers)
+    assert response.status_code == 202, response.data
+    job_url = response.json['status_url']
+    while True:
+        job = client.get(job_url, headers=headers).json
+        if job['status'] in ('completed', 'failed'):
+            break
+        time.sleep(0.05)
+    wall = time.perf_counter() - start
+
+    with app.app_context():
+        rows = sum(db.session.execute(text(f'SELECT COUNT(*) FROM {table}')).scalar() for table in ROW_TABLES)
+
+    api = fake.stats()
+    return {
+        'profile': args.run_profile,
+        'engine': args.engine[0],
+        'videos': videos,
+        'comments': videos * comments_per_video,
+        'status': job['status'],
+        'error': job['error'],
+        'wall_s': wall,
+        'api_calls': api['total_calls'],
+        'quota_units': api['quota_units'],
+        'quota_errors': api['quota_errors'],
+        'rows': rows,
+        'rows_per_s': rows / wall,
+        # ru_maxrss vem em KB no Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=['small', 'medium'])
+    parser.add_argument('--latency', type=float, default=0.0, help='segundos simulados por chamada à API')
+    parser.add_argument('--quota-error-rate', type=float, default=0.0,
+                        help='fração das chamadas que respondem quotaExceeded (cada erro esgota uma chave)')
+    parser.add_argument('--rps', type=float, default=1000, help='limite de requisições por segundo à API')
+    parser.add_argument('--engine', nargs='+', choices=['threads', 'async'], default=['threads'],
+                        help='motor de busca (YOUTUBE_FETCH_ENGINE); async requer httpx')
+    parser.add_argument('--json', action='store_true', help='imprime os resultados como JSON')
+    parser.add_argument('--run-profile', choices=sorted(PROFILES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    results = []
+    for profile in args.profiles:
+        for engine in args.engine:
+            command = [sys.executable, os.path.abspath(__file__), '--run-profile', profile, '--engine', engine,
+                       '--latency', str(args.latency), '--quota-error-rate', str(args.quota_error_rate),
+                       '--rps', str(args.rps)]
+            output = subprocess.run(command, cwd=SERVER_DIR, capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'profile':>8} {'engine':>8} {'videos':>7} {'comments':>9} {'status':>10} {'wall (s)':>9} {'API calls':>10} "
+          f"{'quota':>7} {'rows/s':>9} {'peak RSS (MB)':>14}")
+    for r in results:
+        print(f"{r['profile']:>8} {r['engine']:>8} {r['videos']:>7} {r['comments']:>9} {r['status']:>10} {r['wall_s']:>9.2f} "
+              f"{r['api_calls']:>10} {r['quota_units']:>7} {r['rows_per_s']:>9.0f} {r['peak_rss_mb']:>14.1f}")
+        if r['error']:
+            print(f"         error: {r['error']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Mede linhas/s ao gravar comentários: um objeto ORM por linha vs inserção em lote.
+
+Uso (a partir de server/):
+    python benchmarks/bench_persistence.py --rows 200000 --batch-size 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_persistence.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+
+from app import (  # noqa: E402
+    Analysis, CommentAnalysis, User, app, bulk_insert, comment_rows, db, parse_youtube_datetime
+)
+
+def synthetic_comments(count):
+    for i in range(count):
+        yield {
+            'id': f'comment-{i}',
+            'video_id': f'video-{i % 500}',
+            'author': f'author {i % 997}',
+            'text': f'synthetic comment number {i}',
+            'likes': i % 50,
+            'sentiment': ('positive', 'neutral', 'negative')[i % 3],
+            'published_at': '2024-01-01T12:00:00Z'
+        }
+
+def per_object(analysis_id, count):
+    for comment in synthetic_comments(count):
+        db.session.add(CommentAnalysis(
+            analysis_id=analysis_id,
+            video_id=comment['video_id'],
+            author=comment['author'],
+            text=comment['text'],
+            likes=comment['likes'],
+            sentiment=comment['sentiment'],
+            published_at=parse_youtube_datetime(comment['published_at'])
+        ))
+    db.session.commit()
+
+def run(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:10.2f}s {count / elapsed:14,.0f} rows/s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(name='bench', email='bench@example.com', password='-')
+        db.session.add(user)
+        db.session.commit()
+        analyses = []
+        for _ in range(2):
+            analysis = Analysis(user_id=user.id, channel_id='bench', channel_name='bench')
+            db.session.add(analysis)
+            analyses.append(analysis)
+        db.session.commit()
+
+        print(f"{app.config['SQLALCHEMY_DATABASE_URI']}: {args.rows:,} comments")
+        orm = run('per-object', lambda: per_object(analyses[0].id, args.rows), args.rows)
+        bulk = run('bulk', lambda: bulk_insert(
+            CommentAnalysis, comment_rows(analyses[1].id, synthetic_comments(args.rows)), args.batch_size
+        ), args.rows)
+        print(f"Speedup: {orm / bulk:.2f}x")
+
+if __name__ == '__main__':
+    main()
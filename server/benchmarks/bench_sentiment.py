@@ -0,0 +1,57 @@
+"""Compara a análise de sentimento comentário a comentário com a API em lote.
+
+A referência chama o VADER direto para cada comentário, sem cache; o modo em lote começa com o
+cache de sentimento vazio, então só se beneficia das repetições dentro do próprio corpus.
+
+Uso (a partir de server/):
+    python benchmarks/bench_sentiment.py --size 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer  # noqa: E402
+
+from app import SENTIMENT_PROCESS_WORKERS, SentimentCache, YouTubeAnalyzer, sentiment_label  # noqa: E402
+
+WORDS = [
+    'video', 'channel', 'great', 'love', 'awesome', 'bad', 'terrible', 'boring',
+    'first', 'lol', 'thanks', 'music', 'edit', 'hate', 'nice', 'cool', 'wow',
+    'please', 'more', 'content', 'amazing', 'worst', 'best', 'ok', 'meh', 'sad',
+    'happy', 'funny', 'kkkk', 'muito', 'bom', 'ruim', '😂', '❤️', '🔥', '👎'
+]
+
+def synthetic_corpus(size, seed=42):
+    rng = random.Random(seed)
+    for _ in range(size):
+        yield ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+
+def run(label, fn, size):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:10.2f}s {size / elapsed:14,.0f} comments/s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    corpus = list(synthetic_corpus(args.size))
+    print(f"Synthetic corpus: {len(corpus):,} comments, {SENTIMENT_PROCESS_WORKERS} scoring processes")
+
+    vader = SentimentIntensityAnalyzer()
+    serial = run(
+        'per-comment', lambda: [sentiment_label(vader.polarity_scores(text)['compound']) for text in corpus], args.size
+    )
+    analyzer = YouTubeAnalyzer(cache=SentimentCache(persist=False))
+    batched = run('batched', lambda: analyzer.analyze_sentiments(corpus), args.size)
+    print(f"Speedup: {serial / batched:.2f}x (cache hit rate {analyzer.sentiment_cache.stats()['hit_rate']:.1%})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Roda EXPLAIN QUERY PLAN (SQLite) nas consultas mais usadas pelas rotas e falha se alguma fizer full table scan.
+
+Uso (a partir de server/):
+    python benchmarks/check_query_plans.py
+"""
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'check_query_plans.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from sqlalchemy import func, or_, text  # noqa: E402
+
+from app import (  # noqa: E402
+    AnalysisJob, AnalysisRollup, ChannelDailyRollup, CommentAnalysis, User, VideoAnalysis, VideoCache,
+    Analysis, analysis_comments, analysis_comments_query, analysis_validator_query, app, completed_analyses, db,
+    run_migrations, TrackedChannel
+)
+
+# "SCAN analysis" (ou "SCAN TABLE analysis" em versões antigas) sem índice = full table scan
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)$')
+
+def hot_queries():
+    return {
+        'latest completed analysis': completed_analyses().filter_by(user_id=1)
+            .order_by(Analysis.analysis_date.desc()).limit(1),
+        'latest analysis for channel': completed_analyses().filter_by(user_id=1, channel_id='c')
+            .order_by(Analysis.analysis_date.desc()).limit(1),
+        'videos of analysis': VideoAnalysis.query.filter_by(analysis_id=1)
+            .order_by(VideoAnalysis.published_at.desc()),
+        'analyses of video': VideoAnalysis.query.join(Analysis)
+            .filter(VideoAnalysis.video_id == 'v', Analysis.user_id == 1, Analysis.status == 'completed'),
+        'comments of video': analysis_comments_query(1).filter(CommentAnalysis.video_id == 'v')
+            .order_by(CommentAnalysis.published_at.desc()),
+        'top comments': analysis_comments_query(1).order_by(CommentAnalysis.likes.desc()).limit(5),
+        'comment counts by video': analysis_comments_query(1)
+            .with_entities(CommentAnalysis.video_id, func.count()).group_by(CommentAnalysis.video_id),
+        'user comments of video': CommentAnalysis.query.filter(
+            CommentAnalysis.video_id == 'v',
+            CommentAnalysis.id.in_(
+                db.session.query(analysis_comments.c.comment_id)
+                .join(Analysis, Analysis.id == analysis_comments.c.analysis_id)
+                .filter(Analysis.user_id == 1)
+            )
+        ),
+        'known youtube comments': CommentAnalysis.query
+            .filter(CommentAnalysis.youtube_comment_id.in_(['a', 'b'])),
+        'video cache of channel': VideoCache.query.filter_by(user_id=1, channel_id='c')
+            .order_by(VideoCache.last_updated.desc()),
+        'analysis rollups': AnalysisRollup.query.filter_by(user_id=1)
+            .order_by(AnalysisRollup.analysis_date.desc()),
+        'daily rollups': ChannelDailyRollup.query.filter_by(user_id=1)
+            .order_by(ChannelDailyRollup.day.asc()),
+        'queued jobs': AnalysisJob.query.filter_by(status='queued').order_by(AnalysisJob.created_at),
+        'jobs of batch': AnalysisJob.query.filter_by(batch_id=1).order_by(AnalysisJob.id),
+        'tracked channel by name': TrackedChannel.query.filter(
+            TrackedChannel.user_id == 1,
+            or_(func.lower(TrackedChannel.channel_name) == 'x', TrackedChannel.channel_id == 'x')
+        ),
+        'response cache validator': analysis_validator_query(1),
+        'user by email': User.query.filter(func.lower(User.email) == func.lower('x@example.com')),
+    }
+
+def query_plan(conn, query):
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    return [row.detail for row in conn.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))]
+
+def main():
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        with db.engine.connect() as conn:
+            for name, query in hot_queries().items():
+                plan = query_plan(conn, query)
+                scans = [step for step in plan if FULL_SCAN.match(step)]
+                status = 'FAIL' if scans else 'ok'
+                failures += bool(scans)
+                print(f"[{status:>4}] {name}")
+                for step in plan:
+                    print(f"         {step}")
+    if failures:
+        print(f"{failures} queries fall back to a full table scan")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
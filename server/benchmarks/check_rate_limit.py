@@ -0,0 +1,80 @@
+"""Verifica contra a API falsa que a busca de comentários respeita o rate limit e o número de workers.
+
+- com o token bucket apertado, nenhuma janela de 1s passa de rps + burst chamadas;
+- sem limite de taxa, as chamadas se sobrepõem até COMMENT_FETCH_WORKERS e nunca passam disso.
+
+Uso (a partir de server/):
+    python benchmarks/check_rate_limit.py --rps 20 --burst 5 --workers 4 --latency 0.1
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'check_rate_limit.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+for i in range(1, 4):
+    os.environ.setdefault(f'YOUTUBE_API_KEY_{i}', f'bench-key-{i}-0000000000')
+
+import app as backend  # noqa: E402
+from fake_youtube import FakeYouTube  # noqa: E402
+
+def fetch_comments(fake, rate_limiter, workers):
+    analyzer = backend.YouTubeAnalyzer(
+        rate_limiter=rate_limiter,
+        fetch_workers=workers,
+        key_pool=backend.APIKeyPool(backend.DEVELOPER_KEYS, daily_quota=10 ** 9, service_factory=fake.service_factory)
+    )
+    fake.reset_stats()
+    video_ids = [fake.video_id(index) for index in range(fake.video_count)]
+    comments = sum(len(batch) for batch in analyzer.iter_scored_comment_batches(video_ids))
+    return comments, fake.timing()
+
+def report(name, comments, timing):
+    print(f"{name:>12} {timing['calls']:>6} {comments:>9} {timing['span_s']:>9.2f} {timing['mean_rate']:>10.1f} "
+          f"{timing['max_in_window']:>14} {timing['max_in_flight']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rps', type=float, default=20)
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=backend.COMMENT_FETCH_WORKERS)
+    parser.add_argument('--videos', type=int, default=40)
+    parser.add_argument('--comments-per-video', type=int, default=250, help='3 páginas de commentThreads por vídeo')
+    parser.add_argument('--latency', type=float, default=0.1, help='segundos simulados por chamada à API')
+    args = parser.parse_args()
+
+    fake = FakeYouTube(videos=args.videos, comments_per_video=args.comments_per_video, latency=args.latency)
+    failures = []
+    print(f"{'run':>12} {'calls':>6} {'comments':>9} {'span (s)':>9} {'mean rps':>10} {'max calls/1s':>14} "
+          f"{'in flight':>10}")
+    with backend.app.app_context():
+        backend.db.create_all()
+        backend.run_migrations()
+
+        comments, timing = fetch_comments(fake, backend.TokenBucket(args.rps, args.burst), args.workers)
+        report('rate limited', comments, timing)
+        # Em qualquer janela de 1s: o que reabasteceu no período mais o burst acumulado
+        if timing['max_in_window'] > args.rps + args.burst:
+            failures.append(f"{timing['max_in_window']} calls in 1s exceed rps + burst ({args.rps + args.burst:.0f})")
+        if comments != args.videos * args.comments_per_video:
+            failures.append(f"rate limited run fetched {comments} comments")
+
+        comments, timing = fetch_comments(fake, backend.TokenBucket(10 ** 6, 10 ** 6), args.workers)
+        report('unthrottled', comments, timing)
+        if timing['max_in_flight'] > args.workers:
+            failures.append(f"{timing['max_in_flight']} calls in flight exceed {args.workers} workers")
+        if args.workers > 1 and timing['max_in_flight'] < 2:
+            failures.append('comment requests never overlapped')
+        if comments != args.videos * args.comments_per_video:
+            failures.append(f"unthrottled run fetched {comments} comments")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
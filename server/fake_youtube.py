@@ -0,0 +1,459 @@
+"""Substituto local da YouTube Data API v3 para benchmarks e testes sem chaves reais.
+
+Serve um canal sintético (vídeos x comentários por vídeo) com as mesmas formas de
+resposta, paginação e limites de maxResults da API, latência simulada e erros de quota.
+Entra no lugar do cliente do googleapiclient via APIKeyPool(service_factory=...) e, para
+o motor assíncrono, no lugar do transporte HTTP do httpx:
+
+    fake = FakeYouTube(videos=200, comments_per_video=300, latency=0.05)
+    pool = APIKeyPool(keys, service_factory=fake.service_factory)
+    engine = AsyncFetchEngine(transport=fake.transport())
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Só o transporte do motor assíncrono depende do httpx
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Custo em unidades de quota cobrado pela API real
+QUOTA_COSTS = {
+    'search.list': 100,
+    'channels.list': 1,
+    'videos.list': 1,
+    'commentThreads.list': 1,
+    'playlistItems.list': 1
+}
+MAX_RESULTS = {
+    'search.list': 50,
+    'channels.list': 50,
+    'videos.list': 50,
+    'commentThreads.list': 100,
+    'playlistItems.list': 50
+}
+
+BASE_URI = 'https://youtube.googleapis.com/youtube/v3'
+VIDEO_INTERVAL = timedelta(days=1)
+COMMENT_INTERVAL = timedelta(minutes=1)
+
+WORDS = (
+    'great', 'video', 'love', 'this', 'terrible', 'awful', 'boring', 'amazing', 'thanks',
+    'first', 'why', 'best', 'worst', 'part', 'music', 'edit', 'ok', 'funny', 'sad', 'again'
+)
+
+def http_error(status, reason, message, uri):
+    content = json.dumps({'error': {
+        'code': status,
+        'message': message,
+        'errors': [{'reason': reason, 'domain': 'youtube', 'message': message}]
+    }}).encode()
+    return HttpError(httplib2.Response({'status': status}), content, uri=uri)
+
+class FakeRequest:
+    def __init__(self, service, endpoint, params):
+        self.service = service
+        self.endpoint = endpoint
+        self.params = params
+        self.uri = f"{BASE_URI}/{endpoint.split('.')[0]}"
+
+    def execute(self, **kwargs):
+        return self.service.youtube.handle(self.service.key, self.endpoint, self.params, self.uri)
+
+class FakeResource:
+    def __init__(self, service, name):
+        self.service = service
+        self.name = name
+
+    def list(self, **params):
+        return FakeRequest(self.service, f"{self.name}.list", params)
+
+class FakeYouTubeService:
+    """O que build_youtube_service(key) devolveria, preso a uma chave"""
+
+    def __init__(self, youtube, key):
+        self.youtube = youtube
+        self.key = key
+
+    def search(self):
+        return FakeResource(self, 'search')
+
+    def channels(self):
+        return FakeResource(self, 'channels')
+
+    def videos(self):
+        return FakeResource(self, 'videos')
+
+    def commentThreads(self):
+        return FakeResource(self, 'commentThreads')
+
+    def playlistItems(self):
+        return FakeResource(self, 'playlistItems')
+
+class FakeYouTube:
+    """Canal sintético servido com a mesma interface do cliente da API.
+
+    - latency: segundos de espera por chamada (simula a ida e volta pela rede)
+    - quota_error_rate: fração das chamadas que falham com quotaExceeded
+    - key_quota: unidades por chave antes de a "API" passar a responder quotaExceeded
+    """
+
+    def __init__(self, videos=50, comments_per_video=100, channel_id='UCfakechannel000000000000',
+                 channel_title='Fake Channel', latency=0.0, quota_error_rate=0.0, key_quota=None, seed=0,
+                 video_prefix='fakevid'):
+        self.channel_id = channel_id
+        self.channel_title = channel_title
+        self.video_prefix = video_prefix
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self.key_quota = key_quota
+        self.seed = seed
+        self.started_at = datetime(2024, 1, 1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._comment_counts = []
+        self.add_videos(videos, comments_per_video)
+        self.reset_stats()
+
+    # Conteúdo do canal
+
+    @property
+    def video_count(self):
+        return len(self._comment_counts)
+
+    def add_videos(self, count, comments_per_video=100):
+        """Publica novos vídeos (passam a ser os mais recentes do canal)"""
+        with self._lock:
+            self._comment_counts.extend([comments_per_video] * count)
+
+    def add_comments(self, video_id, count):
+        with self._lock:
+            self._comment_counts[self.video_index(video_id)] += count
+
+    def video_id(self, index):
+        return f'{self.video_prefix}{index:05d}'
+
+    def video_index(self, video_id):
+        """Posição do vídeo no canal; -1 se o ID não for deste canal"""
+        suffix = video_id[len(self.video_prefix):]
+        return int(suffix) if video_id.startswith(self.video_prefix) and suffix.isdigit() else -1
+
+    def uploads_playlist_id(self):
+        return 'UU' + self.channel_id[2:]
+
+    def video_published_at(self, index):
+        return self.started_at + index * VIDEO_INTERVAL
+
+    def comment_published_at(self, video_index, comment_index):
+        return self.video_published_at(video_index) + (comment_index + 1) * COMMENT_INTERVAL
+
+    def comment_text(self, video_id, comment_index):
+        rng = random.Random(f'{self.seed}:{video_id}:{comment_index}')
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+
+    # Contadores
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = {}
+            self.quota_units = 0
+            self.quota_errors = 0
+            self.units_by_key = {}
+            # (endpoint, início, fim) de cada chamada, em time.monotonic()
+            self.call_times = []
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'quota_units': self.quota_units,
+                'quota_errors': self.quota_errors,
+                'units_by_key': dict(self.units_by_key)
+            }
+
+    def timing(self, window=1.0):
+        """Ritmo e concorrência observados: maior número de chamadas iniciadas em qualquer janela
+        de `window` segundos, taxa média e maior número de chamadas em andamento ao mesmo tempo"""
+        with self._lock:
+            call_times = list(self.call_times)
+        starts = sorted(start for _, start, _ in call_times)
+        max_in_window = 0
+        first = 0
+        for last, start in enumerate(starts):
+            while starts[first] <= start - window:
+                first += 1
+            max_in_window = max(max_in_window, last - first + 1)
+        # Fim antes do início no mesmo instante: chamadas encostadas não contam como simultâneas
+        events = sorted([(start, 1) for _, start, _ in call_times] + [(end, -1) for _, _, end in call_times])
+        in_flight = max_in_flight = 0
+        for _, delta in events:
+            in_flight += delta
+            max_in_flight = max(max_in_flight, in_flight)
+        span = starts[-1] - starts[0] if len(starts) > 1 else 0.0
+        return {
+            'calls': len(starts),
+            'span_s': span,
+            'mean_rate': (len(starts) - 1) / span if span else 0.0,
+            'max_in_window': max_in_window,
+            'max_in_flight': max_in_flight
+        }
+
+    def record_call(self, endpoint, start):
+        with self._lock:
+            self.call_times.append((endpoint, start, time.monotonic()))
+
+    def service_factory(self, key):
+        return FakeYouTubeService(self, key)
+
+    def transport(self):
+        """Transporte httpx que responde às requisições REST (GET /youtube/v3/<recurso>) com este canal"""
+        if httpx is None:
+            raise RuntimeError('FakeYouTube.transport() requires httpx (pip install httpx)')
+
+        async def handle_request(request):
+            start = time.monotonic()
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            params = dict(request.url.params)
+            key = params.pop('key', None)
+            if 'maxResults' in params:
+                params['maxResults'] = int(params['maxResults'])
+            endpoint = f"{request.url.path.rsplit('/', 1)[-1]}.list"
+            uri = str(request.url.copy_with(query=None))
+            try:
+                return httpx.Response(200, json=self.respond(key, endpoint, params, uri))
+            except HttpError as e:
+                return httpx.Response(e.status_code, content=e.content)
+            finally:
+                self.record_call(endpoint, start)
+
+        return httpx.MockTransport(handle_request)
+
+    # Respostas
+
+    def handle(self, key, endpoint, params, uri):
+        start = time.monotonic()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.respond(key, endpoint, params, uri)
+        finally:
+            self.record_call(endpoint, start)
+
+    def respond(self, key, endpoint, params, uri):
+        if endpoint not in QUOTA_COSTS:
+            raise http_error(404, 'notFound', f'Unknown method {endpoint}', uri)
+
+        cost = QUOTA_COSTS[endpoint]
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            used = self.units_by_key.get(key, 0)
+            over_quota = self.key_quota is not None and used + cost > self.key_quota
+            if over_quota or (self.quota_error_rate and self._random.random() < self.quota_error_rate):
+                self.quota_errors += 1
+                raise http_error(403, 'quotaExceeded',
+                                 'The request cannot be completed because you have exceeded your quota.', uri)
+            self.units_by_key[key] = used + cost
+            self.quota_units += cost
+            comment_counts = list(self._comment_counts)
+
+        max_results = params.get('maxResults', 5)
+        if max_results > MAX_RESULTS[endpoint]:
+            raise http_error(400, 'invalidParameter', f'Invalid value for maxResults: {max_results}', uri)
+
+        if endpoint == 'search.list':
+            return self._search(params)
+        if endpoint == 'channels.list':
+            return self._channels(params, len(comment_counts))
+        if endpoint == 'playlistItems.list':
+            return self._playlist_items(params, len(comment_counts), uri)
+        if endpoint == 'videos.list':
+            return self._videos(params, comment_counts, uri)
+        return self._comment_threads(params, comment_counts, uri)
+
+    def _page(self, params, total):
+        start = int(params.get('pageToken') or 0)
+        end = min(start + params.get('maxResults', 5), total)
+        next_token = str(end) if end < total else None
+        return start, end, next_token
+
+    def _search(self, params):
+        if params.get('type') == 'channel':
+            return {'items': [{
+                'id': {'kind': 'youtube#channel', 'channelId': self.channel_id},
+                'snippet': {'title': self.channel_title, 'channelId': self.channel_id}
+            }]}
+        return {'items': []}
+
+    def _channels(self, params, video_count):
+        if self.channel_id not in params.get('id', '').split(','):
+            return {'items': []}
+        return {'items': [{
+            'id': self.channel_id,
+            'snippet': {
+                'title': self.channel_title,
+                'description': 'Synthetic channel',
+                'publishedAt': '2020-01-01T00:00:00Z',
+                'thumbnails': {'high': {'url': 'https://example.com/channel.jpg'}}
+            },
+            'statistics': {'subscriberCount': str(video_count * 100), 'videoCount': str(video_count)},
+            'contentDetails': {'relatedPlaylists': {'uploads': self.uploads_playlist_id()}}
+        }]}
+
+    def _playlist_items(self, params, video_count, uri):
+        if params.get('playlistId') != self.uploads_playlist_id():
+            raise http_error(404, 'playlistNotFound', 'The playlist identified with the request cannot be found.', uri)
+
+        # Mais recente primeiro, como a playlist de uploads real
+        start, end, next_token = self._page(params, video_count)
+        items = []
+        for position in range(start, end):
+            index = video_count - 1 - position
+            item = {'contentDetails': {
+                'videoId': self.video_id(index),
+                'videoPublishedAt': f"{self.video_published_at(index).isoformat()}Z"
+            }}
+            if 'snippet' in params.get('part', ''):
+                item['snippet'] = {
+                    'title': f'Video {index}',
+                    'publishedAt': f"{self.video_published_at(index).isoformat()}Z",
+                    'resourceId': {'kind': 'youtube#video', 'videoId': self.video_id(index)}
+                }
+            items.append(item)
+        response = {'items': items, 'pageInfo': {'totalResults': video_count}}
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+    def _videos(self, params, comment_counts, uri):
+        ids = [video_id for video_id in params.get('id', '').split(',') if video_id]
+        if len(ids) > MAX_RESULTS['videos.list']:
+            raise http_error(400, 'invalidParameter', 'Too many video ids', uri)
+
+        items = []
+        for video_id in ids:
+            index = self.video_index(video_id)
+            if not 0 <= index < len(comment_counts):
+                continue
+            items.append({
+                'id': video_id,
+                'snippet': {
+                    'title': f'Video {index}',
+                    'description': f'Synthetic video {index}',
+                    'publishedAt': f"{self.video_published_at(index).isoformat()}Z",
+                    'thumbnails': {'high': {'url': f'https://example.com/{video_id}.jpg'}}
+                },
+                'statistics': {
+                    'viewCount': str(1000 + index * 37),
+                    'likeCount': str(50 + index % 97),
+                    'commentCount': str(comment_counts[index])
+                },
+                'status': {'embeddable': True}
+            })
+        return {'items': items}
+
+    def _comment_threads(self, params, comment_counts, uri):
+        video_id = params.get('videoId', '')
+        index = self.video_index(video_id)
+        if not 0 <= index < len(comment_counts):
+            raise http_error(404, 'videoNotFound', 'The video identified by the videoId parameter could not be found.', uri)
+
+        comment_count = comment_counts[index]
+        start, end, next_token = self._page(params, comment_count)
+        items = []
+        for position in range(start, end):
+            # order=time (padrão da API): do mais novo para o mais antigo
+            comment_index = comment_count - 1 - position
+            items.append({
+                'id': f'{video_id}.c{comment_index:06d}',
+                'snippet': {'videoId': video_id, 'topLevelComment': {'snippet': {
+                    'authorDisplayName': f'user{comment_index % 997}',
+                    'textDisplay': self.comment_text(video_id, comment_index),
+                    'likeCount': comment_index % 13,
+                    'publishedAt': f"{self.comment_published_at(index, comment_index).isoformat()}Z"
+                }}}
+            })
+        response = {'items': items}
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+class FakeYouTubeNetwork(FakeYouTube):
+    """Vários canais sintéticos atrás do mesmo cliente (para lotes de análise).
+
+    As chamadas são encaminhadas ao canal pelo nome buscado, channelId, playlistId ou
+    prefixo do videoId; latência e quota são as de cada canal.
+    """
+
+    def __init__(self, channels, latency=0.0):
+        self.channels = list(channels)
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.call_times = []
+        self._by_id = {channel.channel_id: channel for channel in self.channels}
+        self._by_playlist = {channel.uploads_playlist_id(): channel for channel in self.channels}
+        self._by_title = {channel.channel_title.lower(): channel for channel in self.channels}
+
+    @classmethod
+    def synthetic(cls, count, videos=20, comments_per_video=50, latency=0.0, **options):
+        return cls([
+            FakeYouTube(videos=videos, comments_per_video=comments_per_video, latency=0.0,
+                        channel_id=f'UCfakechannel{i:012d}', channel_title=f'Fake Channel {i}',
+                        video_prefix=f'fake{i:04d}v', seed=i, **options)
+            for i in range(count)
+        ], latency=latency)
+
+    def reset_stats(self):
+        for channel in self.channels:
+            channel.reset_stats()
+        # Os tempos são registrados na rede (handle/transport), não em cada canal
+        with self._lock:
+            self.call_times = []
+
+    def stats(self):
+        totals = {'calls': {}, 'total_calls': 0, 'quota_units': 0, 'quota_errors': 0, 'units_by_key': {}}
+        for channel in self.channels:
+            stats = channel.stats()
+            for field in ('calls', 'units_by_key'):
+                for name, value in stats[field].items():
+                    totals[field][name] = totals[field].get(name, 0) + value
+            for field in ('total_calls', 'quota_units', 'quota_errors'):
+                totals[field] += stats[field]
+        return totals
+
+    def _route(self, endpoint, params):
+        if endpoint == 'search.list':
+            return self._by_title.get(params.get('q', '').replace('+', ' ').lower())
+        if endpoint == 'channels.list':
+            return self._by_id.get(params.get('id', '').split(',')[0])
+        if endpoint == 'playlistItems.list':
+            return self._by_playlist.get(params.get('playlistId'))
+        video_id = (params.get('videoId') or params.get('id', '')).split(',')[0]
+        return next((channel for channel in self.channels if channel.video_index(video_id) >= 0), None)
+
+    def respond(self, key, endpoint, params, uri):
+        if endpoint == 'channels.list' and ',' in params.get('id', ''):
+            # Vários IDs numa chamada: a quota é cobrada uma vez só, pelo primeiro canal conhecido
+            channels = [self._by_id[channel_id] for channel_id in params['id'].split(',') if channel_id in self._by_id]
+            if not channels:
+                return {'items': []}
+            items = channels[0].respond(key, endpoint, params, uri)['items']
+            for channel in channels[1:]:
+                items.extend(channel._channels(params, channel.video_count)['items'])
+            return {'items': items}
+
+        channel = self._route(endpoint, params)
+        if channel is None:
+            if endpoint == 'commentThreads.list':
+                raise http_error(404, 'videoNotFound', 'The video identified by the videoId parameter could not be found.', uri)
+            return {'items': []}
+        return channel.respond(key, endpoint, params, uri)